@@ -1,4 +1,5 @@
 from ._version import __version__
 from .timeline import Timeline
 from .animation import Animation
-from . import blocks, util
+from .profiler import Profiler
+from . import blocks, cache, memory, sources, util, writers
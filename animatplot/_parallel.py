@@ -0,0 +1,245 @@
+"""Renders the frames of an animation in parallel worker processes
+
+The figure and blocks of an animation are pickled and sent once to every
+worker. Each worker renders contiguous chunks of frames to raw RGBA buffers,
+which are handed back in order to a single writer in the parent process.
+
+The same raw frames are kept in a :class:`animatplot.cache.DiskCache`, when
+one is given, and only the frames that aren't in it are rendered.
+"""
+from contextlib import contextmanager
+import pickle
+import time
+from concurrent.futures import ProcessPoolExecutor
+from io import BytesIO
+
+import matplotlib as mpl
+import matplotlib.colors as mcolors
+from matplotlib.animation import (
+    FileMovieWriter, MovieWriter, PillowWriter, writers
+)
+import numpy as np
+
+from animatplot.blocks.base import _artist_list
+from animatplot.cache import _figure_key
+
+_worker = {}
+
+
+def _render_rgba(fig, dpi, savefig_kwargs):
+    """Renders the figure exactly as the matplotlib writers grab it"""
+    buf = BytesIO()
+    fig.savefig(buf, **{**savefig_kwargs, 'format': 'rgba', 'dpi': dpi})
+    return buf.getvalue()
+
+
+def _draw(anim, dpi, savefig_kwargs):
+    """Renders the figure in this process, timed as the draw of the frame"""
+    start = time.perf_counter()
+    rgba = _render_rgba(anim.fig, dpi, savefig_kwargs)
+    if anim.profiler is not None:
+        anim.profiler._record('draw', time.perf_counter() - start)
+    return rgba
+
+
+def _init_worker(payload):
+    cls, state, dpi, savefig_kwargs = pickle.loads(payload)
+    anim = cls.__new__(cls)
+    anim.__dict__.update(state)
+    _worker.update(anim=anim, dpi=dpi, savefig_kwargs=savefig_kwargs)
+
+
+def _render_frames(frames):
+    anim = _worker['anim']
+    rendered = []
+    for i in frames:
+        start = time.perf_counter()
+        anim._update_frame(i)
+        rgba = _render_rgba(anim.fig, _worker['dpi'],
+                            _worker['savefig_kwargs'])
+        # timed here, as the profiler stays in the parent
+        rendered.append((rgba, time.perf_counter() - start))
+    return rendered
+
+
+def _check_writer(writer):
+    if isinstance(writer, PillowWriter):
+        return
+    if (isinstance(writer, MovieWriter)
+            and not isinstance(writer, FileMovieWriter)
+            and writer.frame_format in ('rgba', 'raw')):
+        return
+    raise ValueError(
+        "{} does not accept raw frames, so it cannot be used to save in "
+        "parallel or with a cache. Use a PillowWriter or a pipe based "
+        "MovieWriter."
+        .format(type(writer).__name__))
+
+
+def _write_rgba(writer, rgba):
+    """Hands a raw RGBA frame to a writer in place of ``grab_frame``"""
+    if isinstance(writer, PillowWriter):
+        from PIL import Image
+        im = Image.frombuffer(
+            "RGBA", writer.frame_size, rgba, "raw", "RGBA", 0, 1)
+        if im.getextrema()[3][0] < 255:
+            writer._frames.append(im)
+        else:
+            writer._frames.append(im.convert("RGB"))
+    else:
+        writer._proc.stdin.write(rgba)
+
+
+def _ordered_map(executor, func, chunks, window):
+    """Like executor.map, but with at most ``window`` chunks in flight
+
+    This keeps rendered frames from piling up in memory when the writer is
+    slower than the workers.
+    """
+    chunks = iter(chunks)
+    pending = []
+    for chunk in chunks:
+        pending.append(executor.submit(func, chunk))
+        if len(pending) >= window:
+            yield pending.pop(0).result()
+    while pending:
+        yield pending.pop(0).result()
+
+
+def save(anim, filename, writer=None, fps=None, dpi=None, codec=None,
+         bitrate=None, extra_args=None, metadata=None, savefig_kwargs=None,
+         *, workers, frames, cache=None, chunksize=None,
+         progress_callback=None):
+    """Saves the frames of an animation, rendering them in ``workers``
+    processes
+
+    Mirrors :meth:`matplotlib.animation.Animation.save`, and produces the
+    same output as long as every block is a pure function of the frame
+    number (i.e. an ``Update`` function doesn't keep its own state). With
+    a single worker, frames are rendered in this process.
+    """
+    # Disable matplotlib's "Animation was deleted without rendering" warning
+    anim.animation._draw_was_started = True
+
+    if writer is None:
+        writer = mpl.rcParams['animation.writer']
+    if savefig_kwargs is None:
+        savefig_kwargs = {}
+    else:
+        savefig_kwargs = dict(savefig_kwargs)
+    savefig_kwargs.pop('bbox_inches', None)
+
+    if fps is None:
+        fps = 1000. / anim.animation._interval
+    if dpi is None:
+        dpi = mpl.rcParams['savefig.dpi']
+    if dpi == 'figure':
+        dpi = anim.fig.dpi
+
+    if isinstance(writer, str):
+        writer_kwargs = {key: value for key, value in
+                         [('codec', codec), ('bitrate', bitrate),
+                          ('extra_args', extra_args), ('metadata', metadata)]
+                         if value is not None}
+        writer = writers[writer](fps, **writer_kwargs)
+    _check_writer(writer)
+
+    frames = list(frames)
+    n = len(frames)
+
+    with writer.saving(anim.fig, filename, dpi):
+        if not writer._supports_transparency():
+            facecolor = savefig_kwargs.get('facecolor',
+                                           mpl.rcParams['savefig.facecolor'])
+            if facecolor == 'auto':
+                facecolor = anim.fig.get_facecolor()
+            r, g, b, a = mcolors.to_rgba(facecolor)
+            savefig_kwargs['facecolor'] = a * np.array([r, g, b]) + 1 - a
+            savefig_kwargs['transparent'] = False
+
+        # The first frame is rendered here. This also initializes anything
+        # that matplotlib only computes on the first draw (e.g. the scale of
+        # a quiver), so that the workers start from the same state.
+        anim._profile_frame(frames[0])
+        anim._update_frame(frames[0])
+        first = _draw(anim, dpi, savefig_kwargs)
+
+        keys = [None] * n
+        if cache is not None:
+            settings = dict(savefig_kwargs, dpi=dpi,
+                            writer=type(writer).__name__)
+            # the data of the animated artists is hashed for every frame
+            animated = [block._artists() for block in anim.blocks]
+            if anim._has_slider:
+                animated.append(anim._slider_artists())
+            figure_key = _figure_key(anim.fig, settings,
+                                     _artist_list(animated))
+            keys = anim._frame_keys(frames, figure_key)
+        cached = [key is not None and key in cache for key in keys]
+        dirty = [i for i, hit in zip(frames[1:], cached[1:]) if not hit]
+
+        with _rendered(anim, dirty, workers, chunksize, dpi,
+                       savefig_kwargs) as rendered:
+            for k, (i, key) in enumerate(zip(frames, keys)):
+                if k == 0:
+                    rgba = first
+                elif cached[k]:
+                    anim._profile_frame(i)
+                    start = time.perf_counter()
+                    rgba = cache.get(key)
+                    if rgba is None:
+                        # deleted since, e.g. by another process
+                        anim._update_frame(i)
+                        rgba = _draw(anim, dpi, savefig_kwargs)
+                    elif anim.profiler is not None:
+                        anim.profiler._record('cache',
+                                              time.perf_counter() - start)
+                else:
+                    anim._profile_frame(i)
+                    rgba = next(rendered)
+                if key is not None and not cached[k]:
+                    cache.put(key, rgba)
+                start = time.perf_counter()
+                _write_rgba(writer, rgba)
+                if anim.profiler is not None:
+                    anim.profiler._record('write', time.perf_counter() - start)
+                if progress_callback is not None:
+                    progress_callback(k, n)
+    if cache is not None:
+        cache.evict()
+
+
+@contextmanager
+def _rendered(anim, frames, workers, chunksize, dpi, savefig_kwargs):
+    """Renders frames in order, in workers processes if more than 1"""
+    if workers <= 1 or not frames:
+        def render():
+            for i in frames:
+                anim._update_frame(i)
+                yield _draw(anim, dpi, savefig_kwargs)
+        yield render()
+        return
+
+    state = {key: value for key, value in anim.__dict__.items()
+             if key not in ('animation', '_animate')}
+    # frames are only timed (and their progress reported) in the parent
+    state['profiler'] = None
+    try:
+        payload = pickle.dumps((type(anim), state, dpi, savefig_kwargs))
+    except (pickle.PicklingError, AttributeError, TypeError) as err:
+        raise TypeError("The figure and blocks must be picklable to save "
+                        "in parallel: {}".format(err)) from err
+
+    if chunksize is None:
+        chunksize = max(1, min(16, len(frames) // (4 * workers)))
+    chunks = [frames[k:k+chunksize] for k in range(0, len(frames), chunksize)]
+    with ProcessPoolExecutor(workers, initializer=_init_worker,
+                             initargs=(payload,)) as executor:
+        def render():
+            for rendered in _ordered_map(executor, _render_frames, chunks,
+                                         window=2*workers):
+                for rgba, seconds in rendered:
+                    if anim.profiler is not None:
+                        anim.profiler._record('render', seconds)
+                    yield rgba
+        yield render()
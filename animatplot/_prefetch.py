@@ -0,0 +1,111 @@
+"""Fetches the frames of lazily evaluated data in background threads
+
+While a frame is drawn, the frames of every FrameSource of the blocks that
+the next frames of the timeline need are fetched by a thread pool. Blocks
+then get them ready from :meth:`_Prefetcher.get`. Frames that are no
+longer wanted (e.g. after the slider jumps) are cancelled. IterSources are
+left alone, as they can only be read in order.
+"""
+from concurrent.futures import CancelledError, ThreadPoolExecutor
+import threading
+
+import numpy as np
+
+from animatplot.sources import FrameSource, IterSource, RingSource
+
+
+class _Prefetcher:
+    def __init__(self, blocks, ahead, workers=None):
+        self.blocks = blocks
+        self.ahead = ahead
+        self.workers = workers if workers is not None else min(ahead, 4)
+        self._setup()
+
+    def _setup(self):
+        self._pending = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self._executor = None
+
+    def __getstate__(self):
+        # the threads and the pending frames are not sent along when pickling
+        state = self.__dict__.copy()
+        for key in ('_pending', '_locks', '_lock', '_executor'):
+            del state[key]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._setup()
+
+    def _source_lock(self, source):
+        # sources are only read by one thread at a time
+        with self._lock:
+            return self._locks.setdefault(id(source), threading.Lock())
+
+    def _fetch(self, source, i):
+        with self._source_lock(source):
+            return source[i]
+
+    def get(self, source, i):
+        """Returns frame i of a source, fetched in the background if it was
+        scheduled"""
+        with self._lock:
+            future = self._pending.pop((id(source), i), None)
+        if future is not None:
+            try:
+                return future.result()
+            except CancelledError:
+                pass
+        return self._fetch(source, i)
+
+    def _wanted(self, timeline, first):
+        """Returns the frames of the sources needed from index first on"""
+        n = len(timeline)
+        wanted = {}
+        for k in range(min(self.ahead, n)):
+            frame = timeline._frame((first + k) % n)
+            for block in self.blocks:
+                if block._interpolates:
+                    frames = {int(np.floor(frame)), int(np.ceil(frame))}
+                else:
+                    frames = {int(round(frame))}
+                for name in block._time_data:
+                    source = getattr(block, name, None)
+                    # the frames of a RingSource are already in memory, and
+                    # move to other indices as frames are appended. An
+                    # IterSource only keeps its current frame, and can't
+                    # be read out of order.
+                    if (not isinstance(source, FrameSource)
+                            or isinstance(source, (IterSource, RingSource))):
+                        continue
+                    for i in frames:
+                        if 0 <= i < len(source):
+                            wanted[(id(source), i)] = (source, i)
+        return wanted
+
+    def schedule(self, timeline, first):
+        """Fetches the data of the frames at indices first to
+        first+ahead-1 of the timeline, and cancels any others"""
+        wanted = self._wanted(timeline, first)
+        with self._lock:
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    self.workers, thread_name_prefix='animatplot-prefetch')
+            for key in list(self._pending):
+                if key not in wanted:
+                    self._pending.pop(key).cancel()
+            for key, (source, i) in wanted.items():
+                if key not in self._pending:
+                    self._pending[key] = self._executor.submit(
+                        self._fetch, source, i)
+
+    def close(self):
+        """Cancels the pending frames and stops the threads"""
+        with self._lock:
+            for future in self._pending.values():
+                future.cancel()
+            self._pending.clear()
+            executor, self._executor = self._executor, None
+        if executor is not None:
+            executor.shutdown(wait=True)
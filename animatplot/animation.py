@@ -1,9 +1,16 @@
+from collections import OrderedDict
+import hashlib
+import time
+
 from matplotlib.animation import FuncAnimation, PillowWriter
 from matplotlib.widgets import Button, Slider
 import matplotlib.pyplot as plt
 import numpy as np
 
 from animatplot import Timeline
+from animatplot import _parallel
+from animatplot._prefetch import _Prefetcher
+from animatplot.blocks.base import _artist_list
 
 
 class Animation:
@@ -16,16 +23,37 @@ class Animation:
     timeline : Timeline or 1D array, optional
         If an array is passed in, it will be converted to a Timeline.
         If not given, a timeline will be created using the length of the
-        first block.
+        first block. Only the frames selected by the timeline are displayed
+        and saved (see :meth:`Timeline.select` and :meth:`Timeline.resample`).
+        Frames can be appended to the blocks of an animation with a live
+        timeline while it plays, see :meth:`Timeline.live`.
     fig : matplotlib figure, optional
         The figure that the animation is to occur on
+    blit : bool, optional
+        If True, only the artists animated by the blocks (and the timeline
+        slider) are redrawn on every frame, on top of a cached background
+        of the rest of the figure. Defaults to False.
+    profiler : animatplot.Profiler, optional
+        Records the time taken by every block, the slider, drawing and
+        writing each frame.
+    store_as : numpy dtype, optional
+        Stores the floating point data of every block with this dtype, e.g.
+        'float32', or 'uint16' to quantize it. See
+        :meth:`animatplot.blocks.Block.store_as`.
+    prefetch : int, optional
+        The number of frames after the one displayed whose lazily evaluated
+        data (see :mod:`animatplot.sources`) is fetched by background
+        threads while it is drawn. Jumping with the slider cancels the
+        frames that are no longer needed. IterSources, which can only be
+        read in order, are read as frames are displayed. Defaults to 0.
 
     Attributes
     ----------
     animation
         a matplotlib animation returned from FuncAnimation
     """
-    def __init__(self, blocks, timeline=None, fig=None):
+    def __init__(self, blocks, timeline=None, fig=None, blit=False,
+                 profiler=None, store_as=None, prefetch=0):
         if timeline is None:
             self.timeline = Timeline(range(len(blocks[0])))
         elif not isinstance(timeline, Timeline):
@@ -33,30 +61,202 @@ class Animation:
         else:
             self.timeline = timeline
 
-        _len_time = len(self.timeline)
+        _len_time = self.timeline._data_len
         for block in blocks:
             if len(block) != _len_time:
                 raise ValueError("All blocks must animate for the same amount of time")
 
         self.blocks = blocks
+        if store_as is not None:
+            for block in blocks:
+                block.store_as(store_as)
+        self._prefetcher = None
+        if prefetch:
+            self._prefetcher = _Prefetcher(blocks, prefetch)
+            for block in blocks:
+                block._prefetcher = self._prefetcher
         self.fig = plt.gcf() if fig is None else fig
         self._has_slider = False
         self._pause = False
+        self._blit = blit
+        self.profiler = profiler
+        self._saving = False
+        self._draw_start = None
+        self._write_start = None
+        if profiler is not None:
+            self.fig.canvas.mpl_connect('draw_event', self._profile_draw)
 
         def animate(i):
-            updates = []
-            for block in self.blocks:
-                updates.append(block._update(self.timeline.index))
-            if self._has_slider:
-                self.slider.set_val(self.timeline.index)
-            self.timeline._update()
+            if self.timeline._live and not self._saving:
+                self._sync_live()
+            # saved frames only depend on the frame number, see save
+            index = i if self._saving else self.timeline.index
+            self._profile_frame(index)
+            updates = self._update_frame(index)
+            if not self._saving:
+                self.timeline._update()
+            if self._prefetcher is not None:
+                self._prefetcher.schedule(self.timeline, index + 1)
+            if self.profiler is not None and (self._saving or not self._blit):
+                # timed until the figure is drawn, see _profile_draw
+                self._draw_start = time.perf_counter()
+            if self._blit:
+                return _artist_list(updates)
             return updates
 
-        self.animation = FuncAnimation(
-            self.fig, animate,
-            frames=self.timeline._len,
-            interval=1000/self.timeline.fps
-        )
+        self._animate = animate
+
+        # a live timeline plays for as long as frames may be appended
+        self._live_appended = self.timeline._appended
+        if self.timeline._live:
+            frames = {'frames': None, 'cache_frame_data': False}
+        else:
+            frames = {'frames': self.timeline._len}
+        if self._blit:
+            self.animation = _FigureBlitAnimation(
+                self.fig, animate,
+                init_func=self._init_blit,
+                interval=1000/self.timeline.fps,
+                blit=True,
+                profiler=profiler,
+                **frames
+            )
+        else:
+            self.animation = FuncAnimation(
+                self.fig, animate,
+                interval=1000/self.timeline.fps,
+                **frames
+            )
+
+    def _sync_live(self):
+        """Catches up with the frames appended to a live timeline"""
+        if self.timeline._appended == self._live_appended:
+            return
+        self._live_appended = self.timeline._appended
+        if self._has_slider:
+            if self._frame_cache is not None:
+                # the frames have moved, and the slider changed
+                self._frame_cache.clear()
+            last = max(len(self.timeline) - 1, 0)
+            self.slider.valmax = last
+            self.slider.ax.set_xlim(0, max(last, 1))
+
+    def _update_blocks(self, i):
+        """Updates all of the blocks to display index i of the timeline"""
+        frame = self.timeline._frame(i)
+        nearest = int(round(frame))
+        updates = []
+        for k, block in enumerate(self.blocks):
+            start = time.perf_counter()
+            updates.append(
+                block._update(frame if block._interpolates else nearest))
+            if self.profiler is not None:
+                self.profiler._record(
+                    '{}:{}'.format(k, type(block).__name__),
+                    time.perf_counter() - start)
+        return updates
+
+    def _frame_keys(self, indices, figure_key):
+        """Returns a hash of everything displayed at each index, or None
+
+        figure_key is a hash of the state of the figure, see
+        :mod:`animatplot.cache`. Indices where a block can't tell what it
+        displays have no key.
+        """
+        frames = [self.timeline._frame(i) for i in indices]
+        nearest = [int(round(frame)) for frame in frames]
+        hashes = [hashlib.blake2b(figure_key, digest_size=20)
+                  for _ in indices]
+        for block in self.blocks:
+            keys = block._frame_keys(frames if block._interpolates
+                                     else nearest)
+            for k, key in enumerate(keys):
+                if key is None:
+                    hashes[k] = None
+                elif hashes[k] is not None:
+                    hashes[k].update(key)
+        if self._has_slider:
+            for h, i in zip(hashes, indices):
+                if h is not None:
+                    h.update(repr((i, self.timeline[i])).encode())
+        return [None if h is None else h.hexdigest() for h in hashes]
+
+    def _update_frame(self, i):
+        """Updates all of the blocks (and the slider) to display index i"""
+        updates = self._update_blocks(i)
+        if self._has_slider:
+            start = time.perf_counter()
+            # the blocks are already updated, so the slider callbacks (and
+            # its own redraw) are skipped
+            eventson = self.slider.eventson
+            self.slider.eventson = False
+            try:
+                self.slider.set_val(i)
+            finally:
+                self.slider.eventson = eventson
+            self.slider.valtext.set_text(
+                self.slider.valfmt % (self.timeline[i]))
+            updates.append(self._slider_artists())
+            if self.profiler is not None:
+                self.profiler._record('slider', time.perf_counter() - start)
+        return updates
+
+    def _profile_frame(self, i):
+        """Starts timing the frame at index i, ending the previous one"""
+        if self.profiler is not None:
+            self._profile_end()
+            self.profiler._start_frame(i)
+
+    def _profile_end(self):
+        """Ends the timing of the current frame"""
+        if self.profiler is None:
+            return
+        if self._write_start is not None:
+            self.profiler._record('write',
+                                  time.perf_counter() - self._write_start)
+            self._write_start = None
+        self._draw_start = None
+        self.profiler._end_frame()
+
+    def _profile_draw(self, event):
+        if self._draw_start is not None:
+            now = time.perf_counter()
+            self.profiler._record('draw', now - self._draw_start)
+            self._draw_start = None
+            if self._saving:
+                # the writer takes over from here
+                self._write_start = now
+
+    def _profile_save(self, progress_callback, grabbed=True):
+        """Returns a progress callback for saving, which also marks the
+        start of the writer grabbing each frame
+
+        Frames that are saved in parallel or with a cache aren't grabbed by
+        the writer, and are timed as they are rendered and written instead.
+        """
+        if self.profiler is None:
+            return progress_callback
+        self.profiler._start_save()
+
+        def progress(frame_number, total_frames):
+            if grabbed:
+                # the writer is about to draw the figure
+                self._write_start = None
+                self._draw_start = time.perf_counter()
+            self.profiler._save_progress(frame_number, total_frames)
+            if progress_callback is not None:
+                progress_callback(frame_number, total_frames)
+        return progress
+
+    def _init_blit(self):
+        artists = [block._init() for block in self.blocks]
+        if self._has_slider:
+            artists.append(self._slider_artists())
+        return _artist_list(artists)
+
+    def _slider_artists(self):
+        return [self.slider.poly, self.slider.valtext,
+                getattr(self.slider, '_handle', None)]
 
     def toggle(self, ax=None):
         """Creates a play/pause button to start/stop the animation
@@ -86,6 +286,7 @@ class Animation:
 
         def pause(event):
             if self._pause:
+                self._cancel_scrub()
                 self.animation.event_source.start()
                 self.button.label.set_visible(True)
                 self.button.label2.set_visible(False)
@@ -97,7 +298,8 @@ class Animation:
             self._pause ^= True
         self.button.on_clicked(pause)
 
-    def timeline_slider(self, text='Time', ax=None, valfmt=None, color=None):
+    def timeline_slider(self, text='Time', ax=None, valfmt=None, color=None,
+                        cache_bytes=None, max_scrub_rate=None):
         """Creates a timeline slider.
 
         Parameters
@@ -111,6 +313,18 @@ class Animation:
             Defaults to '%s' for datetime64, timedelta64 and '%1.2f' otherwise.
         color :
             The color of the slider.
+        cache_bytes : int, optional
+            If given, up to this many bytes of rendered frames are kept while
+            scrubbing through a paused animation, so that revisiting a frame
+            only restores its image instead of redrawing the figure. The
+            least recently shown frames are dropped first, and all frames are
+            dropped when the figure is resized or its dpi or axes limits
+            change.
+        max_scrub_rate : float, optional
+            The most frames per second that are rendered while dragging the
+            slider of a paused animation. Requests in between are coalesced,
+            so that only the latest position is rendered. Defaults to no
+            limit.
         """
         if ax is None:
             adjust_plot = {'bottom': .2}
@@ -131,24 +345,104 @@ class Animation:
         if self.timeline.log:
             valfmt = '$10^{%s}$' % valfmt
 
+        valmax = self.timeline._len-1
+        if self.timeline._live:
+            # see _sync_live
+            valmax = max(valmax, 1)
         self.slider = Slider(
-            self.slider_ax, text, 0, self.timeline._len-1,
+            self.slider_ax, text, 0, valmax,
             valinit=0,
             valfmt=(valfmt+self.timeline.units),
             valstep=1, color=color
         )
         self._has_slider = True
+        # the slider is drawn along with the frame it selects
+        self.slider.drawon = False
+        if cache_bytes is not None and self.fig.canvas.supports_blit:
+            self._frame_cache = _FrameCache(cache_bytes)
+            self.fig.canvas.mpl_connect('draw_event', self._cache_scrub)
+        else:
+            self._frame_cache = None
+        self._scrub_interval = 1 / max_scrub_rate if max_scrub_rate else 0
+        self._scrub_index = None
+        self._scrub_timer = None
+        self._cache_index = None
+        self._last_scrub = -np.inf
+        if self.timeline._live:
+            self._live_appended = None
+            self._sync_live()
+        if self.animation._blit:
+            # the slider is redrawn with the rest of the animated artists
+            for artist in self._slider_artists():
+                if artist is not None:
+                    artist.set_animated(True)
 
         def set_time(t):
             self.timeline.index = int(self.slider.val)
             self.slider.valtext.set_text(
                 self.slider.valfmt % (self.timeline[self.timeline.index]))
+            if self._prefetcher is not None:
+                # fetch from the new position instead
+                self._prefetcher.schedule(self.timeline, self.timeline.index)
             if self._pause:
-                for block in self.blocks:
-                    block._update(self.timeline.index)
-                self.fig.canvas.draw()
+                self._request_scrub(self.timeline.index)
         self.slider.on_changed(set_time)
 
+    def _request_scrub(self, index):
+        """Renders index of a paused animation, no more often than the
+        maximum scrub rate. Only the latest pending index is rendered."""
+        self._scrub_index = index
+        if self._scrub_timer is not None:
+            return
+        wait = self._last_scrub + self._scrub_interval - time.perf_counter()
+        if wait <= 0:
+            self._render_scrub()
+        else:
+            self._scrub_timer = self.fig.canvas.new_timer(
+                interval=int(np.ceil(wait * 1000)))
+            self._scrub_timer.single_shot = True
+            self._scrub_timer.add_callback(self._render_scrub)
+            self._scrub_timer.start()
+
+    def _cancel_scrub(self):
+        if self._has_slider:
+            if self._scrub_timer is not None:
+                self._scrub_timer.stop()
+                self._scrub_timer = None
+            self._scrub_index = None
+
+    def _render_scrub(self):
+        self._scrub_timer = None
+        index, self._scrub_index = self._scrub_index, None
+        if index is None or not self._pause:
+            return
+        self._last_scrub = time.perf_counter()
+        if self.timeline._live:
+            self._sync_live()
+
+        self._profile_frame(index)
+        updates = self._update_blocks(index)
+        cache = self._frame_cache
+        if cache is not None and cache.restore(self.fig, index):
+            return
+        if self.animation._blit:
+            updates.append(self._slider_artists())
+            self.animation._redraw(_artist_list(updates))
+            if cache is not None:
+                cache.store(self.fig, index)
+        else:
+            # stored by _cache_scrub once the canvas is drawn
+            self._cache_index = index
+            if self.profiler is not None:
+                self._draw_start = time.perf_counter()
+            self.fig.canvas.draw_idle()
+
+    def _cache_scrub(self, event):
+        if self._cache_index is not None:
+            if self._pause and self._cache_index == self.timeline.index:
+                self._frame_cache.store(self.fig, self._cache_index)
+            self._cache_index = None
+
     def controls(self, timeline_slider_args={}, toggle_args={}):
         """Creates interactive controls for the animation
 
@@ -164,7 +458,38 @@ class Animation:
         self.timeline_slider(**timeline_slider_args)
         self.toggle(**toggle_args)
 
-    def save_gif(self, filename):
+    def memory_report(self):
+        """Reports the memory held by the data of every block
+
+        Owned bytes belong to arrays that own their memory, such as copies
+        made by a block (or arrays given to it). Views count the memory of
+        the arrays (or memory-mapped files) that views held by a block keep
+        alive. Memory shared by several blocks is only counted for the
+        first of them. The memory of matplotlib artists isn't included.
+
+        Returns
+        -------
+        dict
+            Maps every block, named by its position and type (e.g.
+            ``'0:Line'``), to a dict of its ``owned`` and ``views`` bytes,
+            and of ``arrays``, which splits them up by attribute.
+            ``'total'`` holds the sum of the owned and views bytes.
+        """
+        report = {}
+        total = {'owned': 0, 'views': 0}
+        seen = set()
+        for k, block in enumerate(self.blocks):
+            arrays = block._memory(seen)
+            entry = {key: sum(a[key] for a in arrays.values())
+                     for key in total}
+            entry['arrays'] = arrays
+            report['{}:{}'.format(k, type(block).__name__)] = entry
+            for key in total:
+                total[key] += entry[key]
+        report['total'] = total
+        return report
+
+    def save_gif(self, filename, workers=None, cache=None):
         """Saves the animation to a gif
 
         A convience function. Provided to let the user avoid dealing
@@ -174,14 +499,194 @@ class Animation:
         ----------
         filename : str
             the name of the file to be created without the file extension
+        workers : int, optional
+            If greater than 1, the frames are rendered in parallel by this
+            many processes. See :meth:`save`.
+        cache : animatplot.cache.DiskCache, optional
+            Reuses the frames that haven't changed since they were last
+            saved with the cache. See :meth:`save`.
         """
-        self.timeline.index -= 1  # required for proper starting point for save
-        self.animation.save(filename+'.gif', writer=PillowWriter(fps=self.timeline.fps))
+        writer = PillowWriter(fps=self.timeline.fps)
+        self.save(filename+'.gif', writer=writer, workers=workers,
+                  cache=cache)
 
-    def save(self, *args, **kwargs):
+    def save(self, *args, workers=None, start=None, stop=None, cache=None,
+             **kwargs):
         """Saves an animation
 
         A wrapper around :meth:`matplotlib.animation.Animation.save`
+
+        Parameters
+        ----------
+        workers : int, optional
+            If greater than 1, the frames are rendered in parallel by this
+            many processes and handed in order to the writer, which gives
+            the same output as saving serially. The figure and blocks must be
+            picklable, every block must only depend on the frame number, and
+            the writer must accept raw frames (a ``PillowWriter``, or a pipe
+            based writer such as ``FFMpegWriter``).
+        start, stop : int, optional
+            Only saves the frames [start, stop) of the timeline, which
+            default to all of them. Whatever frame is displayed, saving
+            always begins by drawing frame start, so separate processes
+            (or machines) can each save a segment of the animation, to be
+            joined with :func:`animatplot.writers.concat_segments`.
+        cache : animatplot.cache.DiskCache, optional
+            Reuses the frames that were already rendered (by any animation
+            saved with the same cache), and stores the others. Changes to
+            the blocks, the figure or the writer are detected, except for
+            blocks that call arbitrary functions (``Update`` and ``Nuke``),
+            whose frames are always rendered. Like saving with ``workers``,
+            the writer must accept raw frames.
+
+        Examples
+        --------
+        Saving the k-th of n segments:
+
+        >>> bounds = np.linspace(0, len(anim.timeline), n+1).astype(int)
+        >>> anim.save('segment{}.mp4'.format(k), writer='ffmpeg',
+        ...           start=bounds[k], stop=bounds[k+1])
         """
-        self.timeline.index -= 1  # required for proper starting point for save
-        self.animation.save(*args, **kwargs)
+        frames = range(len(self.timeline))[start:stop]
+        if not frames:
+            raise ValueError("There are no frames from start to stop")
+        parallel = (workers is not None and workers > 1) or cache is not None
+        kwargs['progress_callback'] = self._profile_save(
+            kwargs.get('progress_callback'), grabbed=not parallel)
+        if parallel:
+            try:
+                _parallel.save(self, *args, workers=workers or 1,
+                               frames=frames, cache=cache, **kwargs)
+            finally:
+                self._profile_end()
+            return
+
+        # matplotlib draws (and saves) the frames it iterates over, so the
+        # frames to save are drawn by an animation of their own
+        animation = FuncAnimation(self.fig, self._animate, frames=frames)
+        self._saving = True
+        try:
+            animation.save(*args, **kwargs)
+        finally:
+            self._saving = False
+            self._profile_end()
+            # otherwise it starts playing on the next draw of the figure
+            animation.event_source.stop()
+            self.fig.canvas.mpl_disconnect(animation._first_draw_id)
+            self.fig.canvas.mpl_disconnect(animation._close_id)
+
+
+class _FrameCache:
+    """A least recently used cache of rendered frames, limited in bytes
+
+    The frames are copies of the whole canvas, which are only valid for as
+    long as the size, dpi and axes limits of the figure don't change.
+    """
+    def __init__(self, max_bytes):
+        self.max_bytes = max_bytes
+        self.nbytes = 0
+        self._frames = OrderedDict()
+        self._state = None
+
+    def __getstate__(self):
+        # the saved regions of the canvas can't be pickled
+        state = self.__dict__.copy()
+        state.update(nbytes=0, _frames=OrderedDict(), _state=None)
+        return state
+
+    def _check_state(self, fig):
+        state = (tuple(fig.bbox.size), fig.dpi,
+                 tuple((ax.get_xlim(), ax.get_ylim()) for ax in fig.axes))
+        if state != self._state:
+            self.clear()
+            self._state = state
+
+    def clear(self):
+        self._frames.clear()
+        self.nbytes = 0
+
+    def store(self, fig, i):
+        """Saves the current image of the canvas as frame i"""
+        self._check_state(fig)
+        region = fig.canvas.copy_from_bbox(fig.bbox)
+        try:
+            nbytes = memoryview(region).nbytes
+        except TypeError:
+            width, height = fig.bbox.size
+            nbytes = 4 * int(width) * int(height)
+        if nbytes > self.max_bytes:
+            return
+        if i in self._frames:
+            self.nbytes -= self._frames.pop(i)[1]
+        self._frames[i] = (region, nbytes)
+        self.nbytes += nbytes
+        while self.nbytes > self.max_bytes:
+            self.nbytes -= self._frames.popitem(last=False)[1][1]
+
+    def restore(self, fig, i):
+        """Displays frame i if it is cached. Returns whether it was"""
+        self._check_state(fig)
+        if i not in self._frames:
+            return False
+        self._frames.move_to_end(i)
+        fig.canvas.restore_region(self._frames[i][0])
+        fig.canvas.blit(fig.bbox)
+        return True
+
+
+class _FigureBlitAnimation(FuncAnimation):
+    """A FuncAnimation that blits the whole figure at once.
+
+    matplotlib caches one background per axes and only blits the axes
+    bounding box, which leaves out titles and the slider. Instead, a single
+    background of the entire figure is captured after every full draw, and
+    the animated artists are redrawn on top of it, so that the figure stays
+    complete even when it is redrawn while the animation is paused.
+    """
+    def __init__(self, *args, profiler=None, **kwargs):
+        self._background = None
+        self._drawn_artists = []
+        self._profiler = profiler
+        super().__init__(*args, **kwargs)
+
+    def _setup_blit(self):
+        self._draw_id = self._fig.canvas.mpl_connect('draw_event', self._on_draw)
+        super()._setup_blit()
+
+    def _on_draw(self, event):
+        canvas = self._fig.canvas
+        if canvas.is_saving():
+            return
+        self._background = canvas.copy_from_bbox(self._fig.bbox)
+        for a in sorted(self._drawn_artists, key=lambda x: x.get_zorder()):
+            self._fig.draw_artist(a)
+
+    def _blit_clear(self, artists):
+        if self._background is not None:
+            self._fig.canvas.restore_region(self._background)
+
+    def _blit_draw(self, artists):
+        canvas = self._fig.canvas
+        if self._background is None:
+            # no background has been captured yet, it will be on the next draw
+            canvas.draw_idle()
+            return
+        start = time.perf_counter()
+        for a in artists:
+            self._fig.draw_artist(a)
+        canvas.blit(self._fig.bbox)
+        if self._profiler is not None:
+            self._profiler._record('draw', time.perf_counter() - start)
+
+    def _on_resize(self, event):
+        self._background = None
+        super()._on_resize(event)
+
+    def _redraw(self, artists):
+        """Blits the given artists outside of the regular frame sequence."""
+        artists = sorted(artists, key=lambda x: x.get_zorder())
+        for a in artists:
+            a.set_animated(True)
+        self._blit_clear(self._drawn_artists)
+        self._drawn_artists = artists
+        self._blit_draw(artists)
@@ -5,7 +5,7 @@ import numpy as np
 
 
 def vector_plot(X, Y, U, V, t, skip=5, *, t_axis=0, units='', fps=10,
-                pcolor_kw={}, quiver_kw={}):
+                dtype=None, pcolor_kw={}, quiver_kw={}):
     """produces an animation of vector fields
 
     This takes 2D vector field, and plots the magnitude as a pcolomesh, and the
@@ -40,6 +40,9 @@ def vector_plot(X, Y, U, V, t, skip=5, *, t_axis=0, units='', fps=10,
         The frames per second to display the animation at.
     units : str, optional
         The units to display on the timeline.
+    dtype : numpy dtype, optional
+        The floating point type of the magnitude and the arrows. Defaults to
+        that of U and V (float64 if they are integers).
     pcolor_kw : dict, optional
         A dictionary of parameters to pass to pcolormesh.
     quiver_kw : dict, optional
@@ -56,7 +59,7 @@ def vector_plot(X, Y, U, V, t, skip=5, *, t_axis=0, units='', fps=10,
         The timeline that was generated for the animation.
     """
     # plot the magnitude of the vectors as a pcolormesh
-    blocks = vector_comp(X, Y, U, V, skip, t_axis=t_axis,
+    blocks = vector_comp(X, Y, U, V, skip, t_axis=t_axis, dtype=dtype,
                          pcolor_kw=pcolor_kw, quiver_kw=quiver_kw)
 
     # create the animation
@@ -1,4 +1,15 @@
+import hashlib
+
 import matplotlib.pyplot as plt
+from matplotlib.artist import Artist
+import numpy as np
+
+from animatplot import memory
+from animatplot.cache import _digest
+from animatplot.sources import (
+    ChunkedSource, FrameSource, QuantizedSource, RaggedSource, RingSource,
+    SequenceSource
+)
 
 
 class Block:
@@ -17,6 +28,14 @@ class Block:
     ax : matplotlib.axes.Axes
         The matplotlib axes that the block is attached to.
     """
+    # names of the attributes holding data with a time axis
+    _time_data = ()
+    # whether _update accepts fractional frames, see Timeline.resample
+    _interpolates = False
+    # set by an Animation that fetches the frames of FrameSources ahead of
+    # time, see animatplot._prefetch
+    _prefetcher = None
+
     def __init__(self, ax=None, t_axis=None):
         self.ax = ax if ax is not None else plt.gca()
         self.t_axis = t_axis
@@ -25,14 +44,24 @@ class Block:
     def _init(self):
         """initialize the animation.
 
-        To be (optionally) implemented by subclasses
+        Returns the artists that the block animates. When blitting, these
+        artists are left out of the cached background and redrawn on
+        every frame. May be extended by subclasses.
         """
-        pass
+        return self._artists()
+
+    def _artists(self):
+        """Returns a list of the artists animated by the block.
+
+        To be implemented by subclasses that support blitting
+        """
+        return []
 
     def _update(self, i):
         """updates the block to display the corresponding frame i.
 
-        To be implemented by subclasses
+        To be implemented by subclasses. Should return the artist(s)
+        that were modified.
         """
         raise NotImplementedError()
 
@@ -47,3 +76,320 @@ class Block:
         Slice = [slice(None)]*dim
         Slice[self.t_axis] = i
         return tuple(Slice)
+
+    def _as_arrays(self, t_axis, **data):
+        """Converts the data of a block to arrays, as np.asanyarray does
+
+        Data given as lists is copied into new arrays, unless the copies
+        would exceed the memory budget (see :func:`animatplot.memory.budget`).
+        Then all of the data is read a frame at a time through
+        SequenceSources instead. FrameSources are returned as they are, and
+        ragged lists become arrays of objects.
+        """
+        lists = [name for name, value in data.items()
+                 if isinstance(value, (list, tuple))]
+        if lists:
+            nbytes = sum(memory._copy_nbytes(data[name]) for name in lists)
+            what = "Copying {} of {}".format(', '.join(lists),
+                                             type(self).__name__)
+            if not memory._reserve(nbytes, what, lazy=True):
+                return [self._as_source(value, t_axis)
+                        for value in data.values()]
+        return [value if isinstance(value, FrameSource)
+                else _asarray(value) for value in data.values()]
+
+    @staticmethod
+    def _as_source(data, t_axis):
+        """Wraps data in a FrameSource, without copying it"""
+        if isinstance(data, FrameSource):
+            return data
+        if not isinstance(data, (list, tuple)):
+            data = np.moveaxis(np.asanyarray(data), t_axis, 0)
+        return SequenceSource(data)
+
+    def _as_ragged(self, frames, what):
+        """Stores frames of different lengths flat, in a RaggedSource
+
+        If copying the frames would exceed the memory budget, they are read
+        through a SequenceSource instead.
+        """
+        if isinstance(frames, FrameSource):
+            return frames
+        nbytes = sum(np.asanyarray(frame).nbytes for frame in frames)
+        if memory._reserve(nbytes, "Copying " + what, lazy=True):
+            return RaggedSource.from_frames(frames)
+        return SequenceSource(frames)
+
+    def _memory(self, seen):
+        """Returns the bytes held by each attribute of the block
+
+        See :meth:`animatplot.Animation.memory_report`
+        """
+        report = {}
+        for name, value in vars(self).items():
+            owned, views = memory._nbytes(value, seen)
+            if owned or views:
+                report[name] = {'owned': owned, 'views': views}
+        return report
+
+    def to_time_major(self, max_bytes=None, chunk_size=None):
+        """Lays out the data of the block so that every frame is contiguous
+
+        Arrays whose frames are strided in memory (e.g. with ``t_axis=2``)
+        are copied once into C-contiguous arrays with time as the first
+        axis, so that displaying a frame reads a single block of memory
+        instead of gathering scattered values. Arrays whose frames are
+        already contiguous are not copied.
+
+        Parameters
+        ----------
+        max_bytes : int, optional
+            The maximum number of bytes to allocate for the copies. By
+            default there is no limit.
+        chunk_size : int, optional
+            If the copies would need more than ``max_bytes``, the strided
+            arrays are instead wrapped in a
+            :class:`animatplot.sources.ChunkedSource`, which copies this many
+            frames at a time. Otherwise the data is left as it is.
+
+        Returns
+        -------
+        dict
+            ``'actions'`` maps each data attribute of the block to what was
+            done with it: 'contiguous' (no copy needed), 'copied', 'chunked',
+            'skipped' (over the memory budget), or 'unchanged' (not an array
+            with a time axis). ``'nbytes'`` is the number of bytes allocated.
+        """
+        actions = {}
+        arrays = {}
+        for name in self._time_data:
+            data = getattr(self, name)
+            if (isinstance(data, np.ndarray) and data.ndim >= 2
+                    and not self._is_list and str(data.dtype) != 'object'):
+                arrays[name] = data
+            else:
+                actions[name] = 'unchanged'
+
+        moved = {name: np.moveaxis(data, self.t_axis, 0)
+                 for name, data in arrays.items()}
+        strided = [name for name, data in moved.items()
+                   if len(data) and not data[0].flags.c_contiguous]
+        nbytes = sum(moved[name].nbytes for name in strided)
+
+        if max_bytes is not None and nbytes > max_bytes:
+            if chunk_size is None:
+                for name in arrays:
+                    actions[name] = 'skipped' if name in strided else 'contiguous'
+                return {'actions': actions, 'nbytes': 0}
+            for name in strided:
+                data = ChunkedSource(arrays[name], self.t_axis, chunk_size)
+                moved[name] = data
+                actions[name] = 'chunked'
+            nbytes = 0
+        else:
+            for name in strided:
+                moved[name] = np.ascontiguousarray(moved[name])
+                actions[name] = 'copied'
+
+        for name, data in moved.items():
+            actions.setdefault(name, 'contiguous')
+            setattr(self, name, data)
+        if arrays:
+            self.t_axis = 0
+        return {'actions': actions, 'nbytes': nbytes}
+
+    def store_as(self, dtype):
+        """Stores the floating point data of the block with less precision
+
+        The data is converted once, and the block then only holds the
+        converted copy. A floating point dtype (e.g. 'float32' or
+        'float16') casts the data. An unsigned integer dtype (e.g.
+        'uint16') quantizes it (see
+        :class:`animatplot.sources.QuantizedSource`), and frames are
+        decoded as they are displayed. Either way, the colors of an 8-bit
+        colormap are unaffected, while the data takes 2-4 times less memory.
+        Data that is the same in every frame (such as the broadcast x of a
+        Line) is cast once, and broadcast again.
+
+        Parameters
+        ----------
+        dtype : numpy dtype
+            A floating point or unsigned integer type.
+
+        Returns
+        -------
+        dict
+            ``'actions'`` maps each data attribute of the block to what was
+            done with it: 'cast', 'quantized', or 'unchanged' (not floating
+            point data held in memory, or ragged or constant data to be
+            quantized).
+            ``'nbytes'`` is the number of bytes allocated.
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind not in 'fu':
+            raise TypeError("dtype must be a floating point or unsigned "
+                            "integer type")
+        actions = {}
+        nbytes = 0
+        for name in self._time_data:
+            data = getattr(self, name)
+            values = data.values if isinstance(data, RaggedSource) else data
+            # a view that repeats the same frame, see Line
+            constant = (data is values and isinstance(data, np.ndarray)
+                        and not self._is_list and data.ndim >= 2
+                        and data.strides[self.t_axis] == 0)
+            if constant:
+                values = np.take(data, 0, axis=self.t_axis)
+            if (not isinstance(values, np.ndarray)
+                    or values.dtype.kind != 'f' or values.dtype == dtype
+                    or (dtype.kind == 'u' and (data is not values
+                                               or data.ndim < 2))):
+                actions[name] = 'unchanged'
+                continue
+
+            what = "Storing {} of {} as {}".format(
+                name, type(self).__name__, dtype)
+            memory._reserve(values.size * dtype.itemsize, what)
+            nbytes += values.size * dtype.itemsize
+            if dtype.kind == 'f':
+                values = values.astype(dtype)
+                if isinstance(data, RaggedSource):
+                    values = RaggedSource(values, data.offsets)
+                elif constant:
+                    values = np.broadcast_to(
+                        np.expand_dims(values, self.t_axis), data.shape)
+                actions[name] = 'cast'
+            else:
+                t_axis = 0 if self._is_list else self.t_axis
+                values = QuantizedSource.from_array(data, t_axis, dtype)
+                actions[name] = 'quantized'
+            setattr(self, name, values)
+        return {'actions': actions, 'nbytes': nbytes}
+
+    def _rings(self):
+        """Returns the RingSources of the block, by name"""
+        return {name: getattr(self, name) for name in self._time_data
+                if isinstance(getattr(self, name, None), RingSource)}
+
+    def append(self, **frames):
+        """Appends a frame to the data of a live block
+
+        The data that changes over time must have been given to the block
+        as :class:`animatplot.sources.RingSource`, e.g.
+        ``Line(x, RingSource(100, [y0]))``. Append a frame to every one of
+        them at once, then its time to the live timeline of the animation
+        (see :meth:`animatplot.Timeline.live`).
+
+        Parameters
+        ----------
+        **frames
+            The frame of each RingSource of the block, by the name of the
+            data, e.g. ``line.append(y=y)``.
+        """
+        rings = self._rings()
+        if not rings:
+            raise TypeError("{} has no RingSource to append to"
+                            .format(type(self).__name__))
+        if set(frames) != set(rings):
+            raise ValueError("A frame is needed for each of {}, and only "
+                             "those".format(', '.join(sorted(rings))))
+        for name, frame in frames.items():
+            rings[name].append(frame)
+        self._appended()
+
+    def _appended(self):
+        """Called after frames are appended, when the frame at each index
+        may have changed. May be extended by subclasses to drop anything
+        kept per frame.
+        """
+
+    def _get_frame(self, data, i):
+        """Returns frame i of an array, list, or FrameSource
+
+        A fractional i linearly interpolates between the frames around it.
+        """
+        if isinstance(i, (float, np.floating)):
+            return self._interpolate_frame(data, i)
+        if isinstance(data, FrameSource):
+            if self._prefetcher is not None:
+                return self._prefetcher.get(data, i)
+            return data[i]
+        return data[self._make_slice(i, data.ndim)]
+
+    def _interpolate_frame(self, data, i):
+        i0 = int(np.floor(i))
+        weight = i - i0
+        before = self._get_frame(data, i0)
+        if weight == 0:
+            return before
+        after = self._get_frame(data, i0 + 1)
+
+        dtype = np.asarray(before).dtype
+        if np.shape(before) != np.shape(after) or \
+                not np.issubdtype(dtype, np.number):
+            # e.g. ragged data, which can only be displayed as is
+            return before if weight < .5 else after
+        frame = before + weight*(after - before)
+        if np.issubdtype(dtype, np.integer):
+            frame = np.rint(frame).astype(dtype)
+        return frame
+
+    def _frame_data(self, i):
+        """Returns everything that the block displays for frame i
+
+        Used to tell whether a frame has changed (see
+        :mod:`animatplot.cache`). Returns None if that can't be known, e.g.
+        for blocks that call arbitrary functions. May be overridden by
+        subclasses.
+        """
+        if not self._time_data:
+            return None
+        return [self._get_frame(getattr(self, name), i)
+                for name in self._time_data]
+
+    def _frame_keys(self, frames):
+        """Returns a hash of the data displayed for each of the frames"""
+        keys = []
+        for i in frames:
+            data = self._frame_data(i)
+            if data is None:
+                keys.append(None)
+                continue
+            h = hashlib.blake2b(type(self).__name__.encode(), digest_size=20)
+            _digest(h, data)
+            keys.append(h.digest())
+        return keys
+
+    def _len_of(self, data):
+        """Returns the length of the time axis of an array or FrameSource"""
+        if isinstance(data, FrameSource) or self._is_list:
+            return len(data)
+        return data.shape[self.t_axis]
+
+
+def _asarray(data):
+    """np.asanyarray, which makes an array of objects for ragged lists"""
+    try:
+        return np.asanyarray(data)
+    except ValueError:
+        return np.asanyarray(data, dtype=object)
+
+
+def _artist_list(artists):
+    """Flattens the return value of an update into a list of artists
+
+    Accepts None, a single artist, or an arbitrarily nested sequence of
+    artists. Anything that is not an artist is dropped.
+    """
+    if artists is None or isinstance(artists, str):
+        return []
+    if isinstance(artists, Artist):
+        return [artists]
+    try:
+        iterator = iter(artists)
+    except TypeError:
+        return []
+    flat = []
+    for item in iterator:
+        flat.extend(_artist_list(item))
+    return flat
@@ -1,4 +1,8 @@
 from .base import Block
+from animatplot import memory
+from animatplot.sources import (
+    _CHUNK_BYTES, ChunkedSource, SequenceSource, _is_on_disk
+)
 import matplotlib.pyplot as plt
 import numpy as np
 
@@ -10,13 +14,21 @@ class Pcolormesh(Block):
     ----------
     X : 1D or 2D np.ndarray, optional
     Y : 1D or 2D np.ndarray, optional
-    C : list of 2D np.ndarray or a 3D np.ndarray
+    C : list of 2D np.ndarray, a 3D np.ndarray, or a FrameSource
+        If a :class:`animatplot.sources.FrameSource` is given, only the
+        frame being displayed is requested from it.
     ax : matplotlib.axes.Axes, optional
         The matplotlib axes to attach the block to.
         Defaults to matplotlib.pyplot.gca()
     t_axis : int, optional
         The axis of the array that represents time. Defaults to 0.
         No effect if C is a list.
+    chunk_size : int, optional
+        If C is a memory-mapped array or a HDF5 dataset, it is read this
+        many frames at a time. See :class:`animatplot.sources.ChunkedSource`.
+    read_ahead : int, optional
+        If C is a memory-mapped array or a HDF5 dataset, this many frames
+        past the current one are read in the background. Defaults to 0.
 
     Attributes
     ----------
@@ -28,7 +40,11 @@ class Pcolormesh(Block):
     All other keyword arguments get passed to ``axis.pcolormesh``
     see :meth:`matplotlib.axes.Axes.pcolormesh` for details.
     """
-    def __init__(self, *args, ax=None, t_axis=0, **kwargs):
+    _time_data = ('C',)
+    _interpolates = True
+
+    def __init__(self, *args, ax=None, t_axis=0, chunk_size=None, read_ahead=0,
+                 **kwargs):
         if len(args) == 1:
             self.C = args[0]
             self._arg_len = 1
@@ -46,9 +62,12 @@ class Pcolormesh(Block):
         super().__init__(ax, t_axis)
 
         self._is_list = isinstance(self.C, list)
-        self.C = np.asanyarray(self.C)
+        if _is_on_disk(self.C):
+            self.C = ChunkedSource(self.C, t_axis, chunk_size, read_ahead)
+        else:
+            self.C, = self._as_arrays(t_axis, C=self.C)
 
-        Slice = self._make_slice(0, 3)
+        C0 = self._get_frame(self.C, 0)
 
         # replicate matplotlib logic for setting default shading value because
         # matplotlib resets the _shading member variable of the QuadMesh to "flat" after
@@ -57,39 +76,33 @@ class Pcolormesh(Block):
         Nx = self.X.shape[-1]
         Ny = self.Y.shape[0]
         if self.shading == "auto":
-            if (Ny, Nx) == self.C[Slice].shape:
+            if (Ny, Nx) == C0.shape:
                 self.shading = "nearest"
             else:
                 self.shading = "flat"
-        if self.shading == "flat" and ((Ny - 1, Nx - 1) == self.C[Slice].shape):
+        if self.shading == "flat" and ((Ny - 1, Nx - 1) == C0.shape):
             # Need to slice without the workaround in _update()
             self.shading = "flat_corner_grid"
 
         if self._arg_len == 1:
-            self.quad = self.ax.pcolormesh(self.C[Slice], **kwargs)
+            self.quad = self.ax.pcolormesh(C0, **kwargs)
         elif self._arg_len == 3:
-            self.quad = self.ax.pcolormesh(self.X, self.Y, self.C[Slice], **kwargs)
+            self.quad = self.ax.pcolormesh(self.X, self.Y, C0, **kwargs)
 
     def _update(self, i):
+        C = self._get_frame(self.C, i)
         if self.shading == "flat":
-            Slice = self._make_pcolormesh_flat_slice(i, 3)
-            self.quad.set_array(self.C[Slice].ravel())
+            # weird thing to make animation work
+            self.quad.set_array(C[:-1, :-1].ravel())
         else:
-            Slice = self._make_slice(i, 3)
-            self.quad.set_array(self.C[Slice])
+            self.quad.set_array(C)
         return self.quad
 
-    def __len__(self):
-        if self._is_list:
-            return self.C.shape[0]
-        return self.C.shape[self.t_axis]
+    def _artists(self):
+        return [self.quad]
 
-    def _make_pcolormesh_flat_slice(self, i, dim):
-        if self._is_list:
-            return i
-        Slice = [slice(-1)]*3  # weird thing to make animation work
-        Slice[self.t_axis] = i
-        return tuple(Slice)
+    def __len__(self):
+        return self._len_of(self.C)
 
 
 class Imshow(Block):
@@ -97,18 +110,32 @@ class Imshow(Block):
 
     Parameters
     ----------
-    images : list of 2D/3D arrays, or a 3D or 4D array
+    images : list of 2D/3D arrays, a 3D or 4D array, or a FrameSource
         matplotlib considers arrays of the shape
         (n,m), (n,m,3), and (n,m,4) to be images.
         Images is either a list of arrays of those shapes,
         or an array of shape (T,n,m), (T,n,m,3), or (T,n,m,4)
         where T is the length of the time axis (assuming ``t_axis=0``).
+        A :class:`animatplot.sources.FrameSource` of images is only
+        asked for the frame being displayed.
     ax : matplotlib.axes.Axes, optional
         The matplotlib axes to attach the block to.
         Defaults to matplotlib.gca()
     t_axis : int, optional
         The axis of the array that represents time. Defaults to 0.
         No effect if images is a list.
+    chunk_size : int, optional
+        If images is a memory-mapped array or a HDF5 dataset, it is read
+        this many frames at a time. See
+        :class:`animatplot.sources.ChunkedSource`.
+    read_ahead : int, optional
+        If images is a memory-mapped array or a HDF5 dataset, this many
+        frames past the current one are read in the background.
+        Defaults to 0.
+    pyramid : bool, optional
+        If True, frames are displayed at the coarsest level of detail that
+        still has at least as many pixels as the axes show, for their
+        current size and limits (see Notes). Defaults to False.
 
     Attributes
     ----------
@@ -119,23 +146,151 @@ class Imshow(Block):
     -----
     This block accepts additional keyword arguments to be passed to
     :meth:`matplotlib.axes.Axes.imshow`
+
+    The levels of detail of a pyramid average blocks of 2x2, 4x4, 8x8...
+    pixels (repeating an odd last row or column), and cover the same
+    extent as the image. They are computed from the frame being displayed
+    as they are needed, or for every frame at once with
+    :meth:`Imshow.precompute_pyramid`. The level is chosen again when the
+    axes are zoomed or resized.
     """
-    def __init__(self, images, ax=None, t_axis=0, **kwargs):
-        self.ims = np.asanyarray(images)
+    _time_data = ('ims',)
+    _interpolates = True
+
+    def __init__(self, images, ax=None, t_axis=0, chunk_size=None, read_ahead=0,
+                 pyramid=False, **kwargs):
+        if _is_on_disk(images):
+            self.ims = ChunkedSource(images, t_axis, chunk_size, read_ahead)
+        else:
+            self.ims, = self._as_arrays(t_axis, images=images)
         super().__init__(ax, t_axis)
 
         self._is_list = isinstance(images, list)
-        self._dim = len(self.ims.shape)
 
-        Slice = self._make_slice(0, self._dim)
-        self.im = self.ax.imshow(self.ims[Slice], **kwargs)
+        self.pyramid = pyramid
+        self._frame = None
+        self._level = 0
+        self._levels = None
+        self._pyramid = None
+
+        self.im = self.ax.imshow(self._get_frame(self.ims, 0), **kwargs)
+        if pyramid:
+            self._size = self.im.get_size()
+            # so that every level is stretched over the extent of the image
+            self.im.set_extent(self.im.get_extent())
+            self._update(0)
+            self.ax.callbacks.connect('xlim_changed', self._relayout)
+            self.ax.callbacks.connect('ylim_changed', self._relayout)
+            self.ax.figure.canvas.mpl_connect('resize_event', self._relayout)
 
     def _update(self, i):
-        Slice = self._make_slice(i, self._dim)
-        self.im.set_array(self.ims[Slice])
+        if self.pyramid:
+            self._frame = i
+            self._level = self._pyramid_level()
+            self.im.set_array(self._pyramid_frame(i, self._level))
+        else:
+            self.im.set_array(self._get_frame(self.ims, i))
         return self.im
 
+    def _relayout(self, *args):
+        if self._frame is not None and self._pyramid_level() != self._level:
+            self._update(self._frame)
+
+    def _pyramid_level(self):
+        """Returns the level of detail that matches the pixels of the axes"""
+        left, right, bottom, top = self.im.get_extent()
+        # the number of pixels of the image in view, per pixel of the axes
+        factors = []
+        for lim, width, size, pixels in [
+                (self.ax.get_xlim(), right - left, self._size[1],
+                 self.ax.bbox.width),
+                (self.ax.get_ylim(), top - bottom, self._size[0],
+                 self.ax.bbox.height)]:
+            shown = min(abs(lim[1] - lim[0]), abs(width)) * size / abs(width)
+            factors.append(shown / max(pixels, 1))
+        factor = min(factors)
+        if factor < 2:
+            return 0
+        return min(int(np.log2(factor)), int(np.log2(min(self._size))))
+
+    def _pyramid_frame(self, i, level):
+        """Returns frame i at a level of detail"""
+        if self._pyramid is not None and 0 < level <= len(self._pyramid):
+            return self._get_frame(self._pyramid[level-1], i)
+        if self._levels is None or self._levels[0] != i:
+            self._levels = (i, [np.asanyarray(self._get_frame(self.ims, i))])
+        levels = self._levels[1]
+        while len(levels) <= level:
+            levels.append(_halve(levels[-1]))
+        return levels[level]
+
+    def precompute_pyramid(self, levels=None):
+        """Computes the levels of detail of every frame at once
+
+        Parameters
+        ----------
+        levels : int, optional
+            The number of levels to compute, besides the frames themselves.
+            Defaults to every level that frames can be displayed at.
+
+        Returns
+        -------
+        int
+            The number of bytes allocated for the levels.
+        """
+        frame = np.asanyarray(self._get_frame(self.ims, 0))
+        if levels is None:
+            levels = int(np.log2(min(frame.shape[:2])))
+        shapes = []
+        shape = frame.shape
+        for _ in range(levels):
+            shape = (-(-shape[0] // 2), -(-shape[1] // 2)) + shape[2:]
+            shapes.append(shape)
+        length = len(self)
+        dtype = _halve(frame[:2, :2]).dtype
+        nbytes = sum(length * int(np.prod(shape)) for shape in shapes) \
+            * dtype.itemsize
+        memory._reserve(nbytes, "The pyramid of Imshow")
+
+        pyramid = [np.empty((length,) + shape, dtype) for shape in shapes]
+        chunk_size = max(1, _CHUNK_BYTES // max(frame.nbytes, 1))
+        for start in range(0, length, chunk_size):
+            stop = min(start + chunk_size, length)
+            images = np.stack([self._get_frame(self.ims, i)
+                               for i in range(start, stop)])
+            for level in pyramid:
+                images = _halve(images, axis=1)
+                level[start:stop] = images
+        self._pyramid = [SequenceSource(level) for level in pyramid]
+        return nbytes
+
+    def _artists(self):
+        return [self.im]
+
+    def _appended(self):
+        self._levels = None
+        self._pyramid = None
+
     def __len__(self):
-        if self._is_list:
-            return self.ims.shape[0]
-        return self.ims.shape[self.t_axis]
+        return self._len_of(self.ims)
+
+
+def _halve(images, axis=0):
+    """Averages blocks of 2x2 pixels of images whose rows are axis
+
+    An odd last row or column is repeated first. Integer images are
+    rounded back to their type.
+    """
+    pad = [(0, 0)] * images.ndim
+    pad[axis] = (0, images.shape[axis] % 2)
+    pad[axis+1] = (0, images.shape[axis+1] % 2)
+    if pad[axis][1] or pad[axis+1][1]:
+        images = np.pad(images, pad, mode='edge')
+    shape = images.shape
+    blocks = images.reshape(shape[:axis] + (shape[axis]//2, 2,
+                                            shape[axis+1]//2, 2)
+                            + shape[axis+2:])
+    halved = blocks.mean(axis=(axis+1, axis+3))
+    if np.issubdtype(images.dtype, np.integer):
+        halved = np.rint(halved).astype(images.dtype)
+    return halved
@@ -1,7 +1,9 @@
+import hashlib
+
 import numpy as np
 
-from .base import Block
-from animatplot.util import parametric_line
+from .base import Block, _asarray
+from animatplot.sources import FrameSource, RaggedSource, SequenceSource
 
 
 class Line(Block):
@@ -14,9 +16,16 @@ class Line(Block):
     Parameters
     ----------
     x : 1D numpy array, list of 1D numpy arrays or a 2D numpy array, optional
-        The x data to be animated. If 1D then will be constant over animation.
-    y : list of 1D numpy arrays or a 2D numpy array
-        The y data to be animated.
+        The x data to be animated. If 1D then will be constant over animation,
+        and is stored without being copied. If y is ragged, each frame uses
+        as much of a 1D x as it needs.
+        May be a FrameSource if y is also a FrameSource.
+    y : list of 1D numpy arrays, a 2D numpy array, or a FrameSource
+        The y data to be animated. A
+        :class:`animatplot.sources.FrameSource` is only asked for the frame
+        being displayed. Frames of different lengths are stored flat in a
+        :class:`animatplot.sources.RaggedSource`, which may also be given
+        directly.
     ax : matplotlib.axes.Axes, optional
         The matplotlib axes to attach the block to.
         Defaults to matplotlib.pyplot.gca()
@@ -26,6 +35,10 @@ class Line(Block):
 
         The default is chosen to be consistent with:
             X, T = numpy.meshgrid(x, t)
+    decimate : bool, optional
+        If True, every frame is reduced to the points that make a visible
+        difference at the current size and limits of the axes (see Notes).
+        Defaults to False.
     **kwargs
         Passed on to `matplotlib.axes.Axes.plot`.
 
@@ -41,10 +54,26 @@ class Line(Block):
     This block animates a single line - to animate multiple lines you must call
     this once for each line, and then animate all of the blocks returned by
     passing a list of those blocks to `animatplot.Animation`.
+
+    When decimating, frames whose x increases keep, for every column of
+    pixels, its first and last points, and the points of least and
+    greatest y, in order. Points beyond the limits of x (except for one
+    on either side) are left out. Otherwise, consecutive points that fall
+    in the same pixel are dropped. The frames are decimated again when the
+    limits or size of the axes change. See :meth:`Line.precompute_lod` to
+    decimate every frame at once.
     """
-    def __init__(self, *args, ax=None, t_axis=0, **kwargs):
+    _time_data = ('x', 'y')
+    _interpolates = True
+
+    def __init__(self, *args, ax=None, t_axis=0, decimate=False, **kwargs):
 
         super().__init__(ax, t_axis)
+        self._x_const = False
+        self.decimate = decimate
+        self._frame = None
+        self._lod_state = None
+        self._lod_cache = {}
 
         if len(args) == 1:
             y = args[0]
@@ -56,28 +85,58 @@ class Line(Block):
 
         if y is None:
             raise ValueError("Must supply y data to plot")
-        
-        try:
-            y = np.asanyarray(y)
-        except ValueError as err:
-            y = np.asanyarray(y, dtype=object)
-
-        if str(y.dtype) == 'object':
-            self.t_axis = 0
 
-            # ragged array
+        if isinstance(y, (list, tuple)) and not isinstance(x, FrameSource):
+            # lists of frames may be read lazily to fit the memory budget
+            data = {'y': y}
+            if isinstance(x, (list, tuple)) and len(x) and np.ndim(x[0]):
+                data['x'] = x
+            converted = self._as_arrays(0, **data)
+            y = converted[0]
+            if len(converted) == 2:
+                x = converted[1]
+        elif not isinstance(y, FrameSource) and not isinstance(x, FrameSource):
+            y = _asarray(y)
+
+        if isinstance(y, np.ndarray) and str(y.dtype) == 'object':
+            # ragged frames are stored flat, see RaggedSource
             if x is None:
                 raise ValueError("Must specify x data explicitly when passing"
                                  "a ragged array for y data")
-
-            x = np.asanyarray(x, dtype=object)
-
-            if not all(len(xline) == len(yline) for xline, yline in zip(x, y)):
-                raise ValueError("Length of x & y data must match one another "
-                                 "for every frame")
-
-            self._is_list = True
-
+            y = self._as_ragged(y, "the y data of Line")
+            if not isinstance(x, FrameSource):
+                x = _asarray(x)
+                if x.ndim != 1 or str(x.dtype) == 'object':
+                    x = self._as_ragged(x, "the x data of Line")
+
+        if isinstance(y, FrameSource):
+            # frames are only requested when displayed
+            self.t_axis = 0
+            y_lengths = _frame_lengths(y)
+            if x is None:
+                x = np.arange(len(y[0]))
+            elif isinstance(x, FrameSource):
+                if len(x) != len(y):
+                    raise ValueError("x & y must have the same number of "
+                                     "frames")
+                x_lengths = _frame_lengths(x)
+                if (x_lengths is not None and y_lengths is not None
+                        and not np.array_equal(x_lengths, y_lengths)):
+                    raise ValueError("Length of x & y data must match one "
+                                     "another for every frame")
+            else:
+                x = np.asanyarray(x)
+                if x.ndim != 1:
+                    raise ValueError("x must be 1-dimensional or a "
+                                     "FrameSource when y is a FrameSource")
+                if (y_lengths is not None and len(y_lengths)
+                        and y_lengths.max() > len(x)):
+                    raise ValueError("A 1D x must be at least as long as "
+                                     "every frame of the y data")
+                # x is constant over time, and each frame uses the start
+                self._x_const = True
+        elif isinstance(x, FrameSource):
+            raise TypeError("y must be a FrameSource when x is a FrameSource")
         else:
             # Rectangular data
             if y.ndim != 2:
@@ -98,9 +157,10 @@ class Line(Block):
             if x.ndim == 1:
                 # x is constant over time
                 if len(x) == data_length:
-                    # Broadcast x to match y
+                    # Broadcast x to match y, as a view rather than a copy
                     x = np.expand_dims(x, axis=t_axis)
-                    x = np.repeat(x, repeats=y.shape[t_axis], axis=t_axis)
+                    x = np.broadcast_to(x, y.shape)
+                    self._x_const = True
                 else:
                     raise ValueError(shape_mismatch)
             elif x.ndim == 2:
@@ -112,27 +172,213 @@ class Line(Block):
         self.x = x
         self.y = y
 
-        frame_slice = self._make_slice(i=0, dim=2)
-
-        x_first_frame_data = self.x[frame_slice]
-        y_first_frame_data = self.y[frame_slice]
+        x_first_frame_data, y_first_frame_data = self._get_xy(0)
 
         self.line, = self.ax.plot(x_first_frame_data,
                                   y_first_frame_data, **kwargs)
+        if decimate:
+            # the axes are first autoscaled to all of the points
+            self._update(0)
+            self.ax.callbacks.connect('xlim_changed', self._relayout)
+            self.ax.callbacks.connect('ylim_changed', self._relayout)
+            self.ax.figure.canvas.mpl_connect('resize_event', self._relayout)
+
+    def _get_xy(self, i):
+        """Returns the x and y data of frame i"""
+        y = self._get_frame(self.y, i)
+        if not isinstance(self.x, FrameSource) and self.x.ndim == 1:
+            # constant x given along with a FrameSource for y
+            return self.x[:len(y)], y
+        return self._get_frame(self.x, i), y
+
+    def _frame_data(self, i):
+        return list(self._get_xy(i))
 
     def _update(self, frame):
-        frame_slice = self._make_slice(frame, dim=2)
-        x_vector = self.x[frame_slice]
-        y_vector = self.y[frame_slice]
-        self.line.set_data(x_vector, y_vector)
+        if self.decimate:
+            self._frame = frame
+            self.line.set_data(*self._decimated_xy(frame))
+            return self.line
+        x_vector, y_vector = self._get_xy(frame)
+        if self._x_const and len(x_vector) == len(self.line.get_xdata()):
+            # only y changes between frames
+            self.line.set_ydata(y_vector)
+        else:
+            self.line.set_data(x_vector, y_vector)
+        return self.line
+
+    def _artists(self):
+        return [self.line]
+
+    def _appended(self):
+        self._lod_cache = {}
 
     def __len__(self):
-        return self.y.shape[self.t_axis]
+        return self._len_of(self.y)
+
+    def _lod_view(self):
+        """Returns the limits and the size in pixels of the axes"""
+        # reading the limits applies any pending autoscaling first
+        width, height = self.ax.bbox.size
+        return (tuple(self.ax.get_xlim()), tuple(self.ax.get_ylim()),
+                int(round(width)), int(round(height)))
+
+    def _check_lod_view(self):
+        view = self._lod_view()
+        if view != self._lod_state:
+            self._lod_state = view
+            self._lod_cache = {}
+        return view
+
+    def _relayout(self, *args):
+        if self._frame is not None and self._lod_view() != self._lod_state:
+            self._update(self._frame)
+
+    def _decimated_xy(self, frame):
+        view = self._check_lod_view()
+        if frame in self._lod_cache:
+            return self._lod_cache[frame]
+        x, y = self._get_xy(frame)
+        x, y = np.asarray(x), np.asarray(y)
+        index = self._lod_indices(x, y, view)
+        return x[index], y[index]
+
+    def _lod_indices(self, x, y, view):
+        """Returns the indices of the points of a frame to display"""
+        x_px = _pixels(x, view[0], view[2], self.ax.xaxis)
+        if len(x_px) > 1 and np.all(x_px[1:] >= x_px[:-1]):
+            return _minmax_indices(x_px, y, view[2])
+        y_px = _pixels(y, view[1], view[3], self.ax.yaxis)
+        return _cell_indices(x_px, y_px, view[2], view[3])
+
+    def precompute_lod(self):
+        """Decimates every frame at once, for the current view of the axes
+
+        The decimated frames are kept until the limits or size of the axes
+        change. When x is constant and increases, the frames are reduced
+        together, a chunk of frames at a time.
+        """
+        if not self.decimate:
+            raise ValueError("precompute_lod needs a Line with decimate=True")
+        view = self._check_lod_view()
+        cache = {}
+        if self._x_const and isinstance(self.y, np.ndarray):
+            x = np.asarray(self._get_frame(self.x, 0))
+            x_px = _pixels(x, view[0], view[2], self.ax.xaxis)
+            if len(x_px) > 1 and np.all(x_px[1:] >= x_px[:-1]):
+                y = np.moveaxis(self.y, self.t_axis, 0)
+                chunk_size = max(1, 2**22 // max(len(x), 1))
+                for start in range(0, len(y), chunk_size):
+                    chunk = np.asarray(y[start:start+chunk_size])
+                    index = _minmax_indices(x_px, chunk, view[2])
+                    if index.ndim == 1:
+                        # too few points to reduce
+                        index = np.broadcast_to(index,
+                                                (len(chunk), len(index)))
+                    frames = np.take_along_axis(chunk, index, -1)
+                    for i, frame in enumerate(frames):
+                        cache[start+i] = x[index[i]], frame
+        for i in range(len(self)):
+            if i not in cache:
+                cache[i] = self._decimated_xy(i)
+        self._lod_cache = cache
+
+
+def _frame_lengths(source):
+    """Returns the length of every frame of a source, if known up front
+
+    Only frames that are already in memory are looked at, so that lazy
+    sources aren't read. Otherwise mismatches show up as frames are
+    displayed.
+    """
+    if isinstance(source, RaggedSource):
+        return source.lengths
+    if (isinstance(source, SequenceSource)
+            and isinstance(source.seq, (list, tuple))):
+        # lists read lazily to fit the memory budget, see Block._as_arrays
+        return np.fromiter((len(frame) for frame in source.seq),
+                           dtype=np.int64, count=len(source))
+    return None
+
+
+def _pixels(values, lim, npix, axis):
+    """Converts data to pixel columns (or rows) of the axes, from lim[0]"""
+    transform = axis.get_transform()
+    values = transform.transform(np.asarray(values, dtype=float))
+    lo, hi = transform.transform(np.asarray(lim, dtype=float))
+    return (values - lo) * (npix / (hi - lo))
+
+
+def _minmax_indices(x_px, y, npix):
+    """Returns the points of increasing x to draw in each column of pixels
+
+    For every column, these are the first and last points, and the points
+    of least and greatest y in between, in order. y may hold the frames
+    of a constant x as rows, which are all reduced at once.
+    """
+    # only the points within the axes, and one on either side
+    start = max(np.searchsorted(x_px, 0, 'left') - 1, 0)
+    stop = min(np.searchsorted(x_px, npix, 'right') + 1, len(x_px))
+    column = np.floor(x_px[start:stop])
+    starts = np.flatnonzero(np.diff(column)) + 1
+    starts = np.concatenate([[0], starts]) if stop > start else starts
+    if stop - start <= 4 * len(starts):
+        return np.arange(start, stop)
+
+    y = y[..., start:stop]
+    ends = np.append(starts[1:], stop - start) - 1
+    counts = ends - starts + 1
+    position = np.arange(stop - start)
+
+    def first_at(extreme):
+        # the first point in each column where y equals its extreme
+        at = y == np.repeat(extreme, counts, axis=-1)
+        first = np.minimum.reduceat(np.where(at, position, stop), starts,
+                                    axis=-1)
+        # columns that are all NaN
+        return np.minimum(first, ends)
+
+    low = first_at(np.fmin.reduceat(y, starts, axis=-1))
+    high = first_at(np.fmax.reduceat(y, starts, axis=-1))
+    shape = low.shape
+    index = np.stack([np.broadcast_to(starts, shape), np.minimum(low, high),
+                      np.maximum(low, high), np.broadcast_to(ends, shape)],
+                     axis=-1)
+    return index.reshape(shape[:-1] + (-1,)) + start
+
+
+def _cell_indices(x_px, y_px, width, height):
+    """Returns the first and last points of every run in the same pixel
+
+    Points beyond the axes are put in the pixels around its edges, so the
+    points in between the first and last of a run outside the axes are
+    left out too.
+    """
+    x_px = np.floor(np.clip(x_px, -1, width))
+    y_px = np.floor(np.clip(y_px, -1, height))
+    change = (x_px[1:] != x_px[:-1]) | (y_px[1:] != y_px[:-1])
+    keep = np.ones(len(x_px), dtype=bool)
+    keep[1:-1] = change[:-1] | change[1:]
+    return np.flatnonzero(keep)
+
+
+class _PrefixSource(FrameSource):
+    """Frame i is the first i+1 values of an array, as a view"""
+    def __init__(self, data):
+        self.data = data
+
+    def __len__(self):
+        return len(self.data)
+
+    def _get_frame(self, i):
+        return self.data[:i+1]
 
 
 class ParametricLine(Line):
     """Animates lines
 
+    Frame i of the animation displays the first i+1 points of the line.
+
     Parameters
     ----------
     x, y : 1D numpy array
@@ -151,8 +397,39 @@ class ParametricLine(Line):
     :meth:`matplotlib.axes.Axes.plot`
     """
     def __init__(self, x, y, *args, **kwargs):
-        x_grid, y_grid = parametric_line(x, y)
-        super().__init__(x_grid, y_grid, *args, *kwargs)
+        x = np.asanyarray(x)
+        y = np.asanyarray(y)
+        if len(x) != len(y):
+            raise ValueError("Arrays must be the same length")
+        self._lod_kept = None
+        super().__init__(_PrefixSource(x), _PrefixSource(y), *args, **kwargs)
+
+    def _frame_keys(self, frames):
+        # frame i shows the first i+1 points, which are hashed one stretch
+        # after another instead of hashing every frame from the start
+        shown = [int(np.floor(i + .5)) for i in frames]
+        hashes = [hashlib.blake2b(data.dtype.str.encode())
+                  for data in [self.x.data, self.y.data]]
+        keys = {}
+        start = 0
+        for i in sorted(set(shown)):
+            for h, data in zip(hashes, [self.x.data, self.y.data]):
+                h.update(np.ascontiguousarray(data[start:i+1]).tobytes())
+            start = i + 1
+            keys[i] = hashlib.blake2b(b''.join(h.digest() for h in hashes),
+                                      digest_size=20).digest()
+        return [keys[i] for i in shown]
+
+    def _lod_indices(self, x, y, view):
+        # every frame is the start of the whole line, which is decimated once
+        if self._lod_kept is None or self._lod_kept[0] != view:
+            x_px = _pixels(self.x.data, view[0], view[2], self.ax.xaxis)
+            y_px = _pixels(self.y.data, view[1], view[3], self.ax.yaxis)
+            self._lod_kept = (view, _cell_indices(x_px, y_px, view[2],
+                                                  view[3]))
+        kept = self._lod_kept[1]
+        last = len(x) - 1
+        return np.append(kept[:np.searchsorted(kept, last)], last)
 
 
 class Scatter(Block):
@@ -160,14 +437,19 @@ class Scatter(Block):
 
     Parameters
     ----------
-    x : list of 1D numpy arrays or a 2D numpy array
-        The x data to be animated.
-    y : list of 1D numpy arrays or a 2D numpy array
-        The y data to be animated.
-    s : scalar, or array_like of the same form as x/y, optional
+    x : list of 1D numpy arrays, a 2D numpy array, or a FrameSource
+        The x data to be animated. Frames of different lengths are stored
+        flat in a :class:`animatplot.sources.RaggedSource`.
+    y : list of 1D numpy arrays, a 2D numpy array, or a FrameSource
+        The y data to be animated. Must be a FrameSource if x is one.
+    s : scalar, array_like of the same form as x/y, or a FrameSource, optional
         The size of the data points to be animated.
-    c : color, optional
-        The color of the data points. Cannot [yet] be animated.
+    c : color, array_like of the same form as x/y, or a FrameSource, optional
+        The color of the data points. Values of the same form as x/y (or a
+        FrameSource) are animated, and mapped to colors with the colormap.
+        Unless a norm, or vmin and vmax are given, the norm is fixed to the
+        range of all of the values (or of the first frame for a
+        FrameSource), so that colors mean the same in every frame.
     ax : matplotlib.axes.Axes, optional
         The matplotlib axes to attach the block to.
         Defaults to matplotlib.pyplot.gca()
@@ -188,26 +470,95 @@ class Scatter(Block):
     This block accepts additional keyword arguments to be passed to
     :meth:`matplotlib.axes.Axes.scatter`
     """
+    _time_data = ('x', 'y', 's')
+    _interpolates = True
+
     def __init__(self, x, y, s=None, c=None, ax=None, t_axis=0, **kwargs):
-        self.x = np.asanyarray(x)
-        self.y = np.asanyarray(y)
-        if self.x.shape != self.y.shape:
+        if not (isinstance(x, FrameSource) or isinstance(y, FrameSource)):
+            data = {'x': x, 'y': y}
+            if isinstance(s, (list, tuple, np.ndarray)):
+                data['s'] = s
+            converted = self._as_arrays(t_axis, **data)
+            x, y = converted[:2]
+            if len(converted) == 3:
+                s = converted[2]
+            if isinstance(x, np.ndarray) and str(x.dtype) == 'object':
+                # ragged frames are stored flat, see RaggedSource
+                if np.shape(y) != x.shape:
+                    raise ValueError("x, y must have the same shape"
+                                     "or be lists of the same length")
+                x = self._as_ragged(x, "the x data of Scatter")
+                y = self._as_ragged(y, "the y data of Scatter")
+                if np.shape(s) == (len(x),) and str(s.dtype) == 'object':
+                    s = self._as_ragged(s, "the sizes of Scatter")
+
+        if isinstance(x, FrameSource) or isinstance(y, FrameSource):
+            if not (isinstance(x, FrameSource) and isinstance(y, FrameSource)):
+                raise TypeError("x, y must both be FrameSources, or neither")
+            if len(x) != len(y):
+                raise ValueError("x, y must have the same number of frames")
+            x_lengths, y_lengths = _frame_lengths(x), _frame_lengths(y)
+            if (x_lengths is not None and y_lengths is not None
+                    and not np.array_equal(x_lengths, y_lengths)):
+                raise ValueError("x, y must have the same length in every "
+                                 "frame")
+        elif x.shape != y.shape:
             raise ValueError("x, y must have the same shape"
                              "or be lists of the same length")
+        self.x, self.y = x, y
 
-        self.c = c
         self.s = self._parse_s(s)
+        self.c = self._parse_c(c)
         super().__init__(ax, t_axis)
 
-        self._is_list = (self.x.dtype == 'object')
-        Slice = self._make_slice(0, 2)
-        s_Slice = self._make_s_slice(0, 2)
-        self.scat = self.ax.scatter(self.x[Slice], self.y[Slice],
-                                    self.s[s_Slice], self.c, **kwargs)
+        x0, y0 = self._get_frame(self.x, 0), self._get_frame(self.y, 0)
+        if self._c_like_x:
+            c = self._get_frame(self.c, 0)
+            if 'norm' not in kwargs:
+                if isinstance(self.c, RaggedSource):
+                    values = self.c.values
+                elif isinstance(self.c, FrameSource):
+                    values = c
+                else:
+                    values = self.c
+                kwargs.setdefault('vmin', np.nanmin(values))
+                kwargs.setdefault('vmax', np.nanmax(values))
+        self.scat = self.ax.scatter(x0, y0, self._get_s(0), c, **kwargs)
+
+        # offsets can be written in place when there are the same number of
+        # points in every frame, with no units to convert
+        self._in_place = all(
+            np.issubdtype(np.asarray(frame).dtype, np.number)
+            for frame in (x0, y0))
+        if self._in_place:
+            # a plain array rather than the masked array made by scatter
+            self.scat.set_offsets(np.column_stack((x0, y0)))
+
+    def _parse_c(self, c):
+        self._c_like_x = False
+        if isinstance(c, FrameSource):
+            self._c_like_x = True
+        elif c is not None and not isinstance(c, str):
+            values = _asarray(c)
+            if isinstance(self.x, RaggedSource):
+                if values.shape == (len(self.x),) and values.dtype == object:
+                    self._c_like_x = True
+                    c = self._as_ragged(values, "the colors of Scatter")
+            elif (not isinstance(self.x, FrameSource)
+                    and values.shape == self.x.shape):
+                self._c_like_x = True
+                c = values
+        if self._c_like_x:
+            # the colors are animated
+            self._time_data = Scatter._time_data + ('c',)
+        return c
 
     def _parse_s(self, s):
+        if isinstance(s, FrameSource):
+            self._s_like_x = True
+            return s
         s = np.asanyarray(s)
-        self._s_like_x = (s.shape == self.x.shape)
+        self._s_like_x = (s.shape == getattr(self.x, 'shape', None))
         if not self._s_like_x:
             if len(s.shape) == 0:
                 s = s[None]
@@ -215,25 +566,39 @@ class Scatter(Block):
                 raise ValueError("s is not a scalar, or like x/y.")
         return s
 
-    def _make_s_slice(self, i, dim):
+    def _get_s(self, i):
         if self._s_like_x:
-            return self._make_slice(i, dim)
-        return 0
-
-    def _update(self, i):
-        Slice = self._make_slice(i, 2)
-        s_slice = self._make_s_slice(i, 2)
+            return self._get_frame(self.s, i)
+        return self.s[0]
+
+    def _set_offsets(self, x, y):
+        offsets = self.scat.get_offsets()
+        if (self._in_place and type(offsets) is np.ndarray
+                and offsets.shape == (len(x), 2)):
+            offsets[:, 0] = x
+            offsets[:, 1] = y
+            self.scat.stale = True
+        else:
+            self.scat.set_offsets(np.column_stack((x, y)))
 
-        x, y = self.x[Slice], self.y[Slice]
-        data = np.vstack((x, y)).T
+    def _frame_data(self, i):
+        data = [self._get_frame(self.x, i), self._get_frame(self.y, i),
+                self._get_s(i)]
+        if self._c_like_x:
+            data.append(self._get_frame(self.c, i))
+        return data
 
-        self.scat.set_offsets(data)  # x, y
+    def _update(self, i):
+        self._set_offsets(self._get_frame(self.x, i),
+                          self._get_frame(self.y, i))
         if self._s_like_x:
-            self.scat._sizes = self.s[s_slice]
-        # self.scat.set_array(x_vector, y_vector) # color
+            self.scat.set_sizes(self._get_s(i))
+        if self._c_like_x:
+            self.scat.set_array(self._get_frame(self.c, i))
         return self.scat
 
+    def _artists(self):
+        return [self.scat]
+
     def __len__(self):
-        if self._is_list:
-            return self.x.shape[0]
-        return self.x.shape[self.t_axis]
+        return self._len_of(self.x)
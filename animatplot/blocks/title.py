@@ -1,6 +1,10 @@
+from collections import OrderedDict
 from string import Formatter
 
+import numpy as np
+
 from .base import Block
+from animatplot.sources import RingSource
 
 
 class Title(Block):
@@ -13,10 +17,14 @@ class Title(Block):
 
     Parameters
     ----------
-    text : str or list of str
+    text : str, list of str, or RingSource of str
         Text to display as the title.
         Either supplied as a list of strings, one for each timestep, or as a
         base string with curly braces for any "replacement fields".
+        The strings (or the values of the replacement fields) may be given
+        as a :class:`animatplot.sources.RingSource`, to append to a live
+        animation with ``append(text=...)``, or e.g. ``append(t=...)`` for
+        a field t (see :meth:`animatplot.blocks.Block.append`).
     ax : matplotlib.axes.Axes, optional
         The matplotlib axes to attach the block to.
         Defaults to matplotlib.pyplot.gca()
@@ -27,6 +35,10 @@ class Title(Block):
     kwargs : optional
         If kwarg matches a field in the format string, then passed on to
         str.format(), else passed on to matplotlib.axes.Axes.set_title().
+    cache_size : int, optional
+        The number of formatted titles to keep, so that frames which are
+        displayed again (e.g. while scrubbing) aren't formatted again.
+        Titles are otherwise formatted as they are displayed.
 
     Attributes
     ----------
@@ -34,7 +46,7 @@ class Title(Block):
         The matplotlib axes that the block is attached to.
     """
 
-    def __init__(self, text, ax=None, *args, **kwargs):
+    def __init__(self, text, ax=None, *args, cache_size=128, **kwargs):
         super().__init__(ax)
 
         if isinstance(text, str):
@@ -64,34 +76,106 @@ class Title(Block):
             else:
                 self._length = 1
 
-            titles = []
-            for i in range(self._length):
-                replacements_at_one_time = {replacement: array[i]
-                                            for replacement, array
-                                            in replacements.items()}
-
-                title = text.format(*args, **replacements_at_one_time)
-                titles.append(title)
-            self.titles = titles
+            self._format = text.format
+            self._args = args
+            self._replacements = replacements
+            self._titles = None
 
-        elif isinstance(text, list):
+        elif isinstance(text, (list, RingSource)):
             if not all(isinstance(x, str) for x in text):
                 raise TypeError("Not all the elements in the list given as "
                                 "argument text are strings")
             self._length = len(text)
-            self.titles = text
+            self._titles = text
+            self._replacements = {}
             self._mpl_kwargs = kwargs
 
         else:
             raise TypeError("argument text must be either a string or a list "
                             "of strings")
 
+        self._cache = OrderedDict()
+        self._cache_size = cache_size
+
         # Draw the title for the first frame
-        self._update(0)
+        self.text = self.ax.set_title(label=self._get_title(0),
+                                      **self._mpl_kwargs)
+
+    @property
+    def titles(self):
+        """list of str: The title of every frame
+
+        Titles are formatted lazily, one frame at a time, as they are
+        displayed. This formats all of them at once. Setting it replaces
+        the title of every frame.
+        """
+        if isinstance(self._titles, RingSource):
+            return [self._titles[i] for i in range(len(self._titles))]
+        if self._titles is not None:
+            return self._titles
+        if not self._replacements:
+            return [self._format(*self._args)] * self._length
+        # convert whole arrays to python scalars at once, rather than
+        # formatting numpy scalars one at a time
+        names = list(self._replacements)
+        columns = [_as_list(self._replacements[name]) for name in names]
+        return [self._format(*self._args, **dict(zip(names, values)))
+                for values in zip(*columns)]
+
+    @titles.setter
+    def titles(self, titles):
+        if not all(isinstance(x, str) for x in titles):
+            raise TypeError("Not all the elements of titles are strings")
+        self._titles = list(titles)
+        self._length = len(self._titles)
+        self._replacements = {}
+        self._cache.clear()
+
+    def _get_title(self, i):
+        if self._titles is not None:
+            return self._titles[i]
+        try:
+            self._cache.move_to_end(i)
+            return self._cache[i]
+        except KeyError:
+            pass
+        title = self._format(*self._args, **{
+            name: values[i] for name, values in self._replacements.items()})
+        if self._cache_size:
+            self._cache[i] = title
+            if len(self._cache) > self._cache_size:
+                self._cache.popitem(last=False)
+        return title
+
+    def _frame_data(self, i):
+        return [self._get_title(i)]
 
     def _update(self, i):
-        self.text = self.ax.set_title(label=self.titles[i], **self._mpl_kwargs)
+        self.text.set_text(self._get_title(i))
         return self.text
 
+    def _artists(self):
+        return [self.text]
+
+    def _rings(self):
+        if isinstance(self._titles, RingSource):
+            return {'text': self._titles}
+        return {name: values for name, values in self._replacements.items()
+                if isinstance(values, RingSource)}
+
+    def _appended(self):
+        self._cache.clear()
+
     def __len__(self):
+        rings = self._rings()
+        if rings:
+            return len(next(iter(rings.values())))
         return self._length
+
+
+def _as_list(values):
+    """Converts numeric arrays to python scalars that format the same"""
+    if isinstance(values, np.ndarray) and (
+            values.dtype.kind in 'biu' or values.dtype == np.float64):
+        return values.tolist()
+    return values
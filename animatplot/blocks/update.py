@@ -1,4 +1,4 @@
-from .base import Block
+from .base import Block, _artist_list
 
 
 class Update(Block):
@@ -13,7 +13,7 @@ class Update(Block):
         This function will be called once for each frame of the animation.
         The first argument to this function must be an integer
         representing the frame number. It should return a matplotlib
-        artist.
+        artist (or a list of artists), which is required for blitting.
     length : int
         The number of frames to display.
     fargs : list, optional
@@ -33,10 +33,14 @@ class Update(Block):
         self.fargs = fargs
         super().__init__(ax)
 
-        func(0, *fargs)
+        self._drawn = func(0, *fargs)
 
     def _update(self, i):
-        self.func(i, *self.fargs)
+        self._drawn = self.func(i, *self.fargs)
+        return self._drawn
+
+    def _artists(self):
+        return _artist_list(self._drawn)
 
     def __len__(self):
         return self.length
@@ -70,7 +74,18 @@ class Nuke(Update):
     ----------
     ax : matplotlib.axes.Axes
         The matplotlib axes to which the block is attached.
+
+    Notes
+    -----
+    When blitting, every artist drawn on the axes is treated as animated,
+    but the axes decorations (ticks, labels, limits) are not redrawn.
     """
     def _update(self, i):
         self.ax.clear()
         self.func(i, *self.fargs)
+        return self._artists()
+
+    def _artists(self):
+        ax = self.ax
+        return [*ax.collections, *ax.images, *ax.lines,
+                *ax.patches, *ax.texts, *ax.artists, *ax.tables]
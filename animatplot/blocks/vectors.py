@@ -1,5 +1,7 @@
 from .base import Block
 from .image_like import Pcolormesh
+from animatplot import memory
+from animatplot.sources import FrameSource, FunctionSource
 import numpy as np
 
 
@@ -13,10 +15,10 @@ class Quiver(Block):
         The x positions of the arrows. Cannot be animated.
     Y : 1D or 2D numpy array
         The y positions of the arrows. Cannot be animated.
-    U : 2D or 3D numpy array
+    U : 2D or 3D numpy array, or a FrameSource
         The U displacement of the arrows. 1 dimension
         higher than the X, Y arrays.
-    V : 2D or 3D numpy array
+    V : 2D or 3D numpy array, or a FrameSource
         The V displcement of the arrows. 1 dimension
         higher than the X, Y arrays.
     ax : matplotlib.axes.Axes, optional
@@ -36,38 +38,59 @@ class Quiver(Block):
     This block accepts additional keyword arguments to be passed to
     :meth:`matplotlib.axes.Axes.quiver`
     """
+    _time_data = ('U', 'V')
+    _interpolates = True
+
     def __init__(self, X, Y, U, V, ax=None, t_axis=0, **kwargs):
         self.X = X
         self.Y = Y
-        self.U = np.asanyarray(U)
-        self.V = np.asanyarray(V)
         if X.shape != Y.shape:
             raise ValueError("X, Y must have the same shape")
-        if self.U.shape != self.V.shape:
+        is_list = isinstance(U, list)
+        if not (isinstance(U, FrameSource) or isinstance(V, FrameSource)):
+            # lists of frames always have time first
+            U, V = self._as_arrays(0 if is_list else t_axis, U=U, V=V)
+        if isinstance(U, FrameSource) or isinstance(V, FrameSource):
+            if not (isinstance(U, FrameSource) and isinstance(V, FrameSource)):
+                raise TypeError("U, V must both be FrameSources, or neither")
+            if len(U) != len(V):
+                raise ValueError("U, V must have the same length")
+        elif U.shape != V.shape:
             raise ValueError("U, V must have the same shape")
+        self.U, self.V = U, V
 
         super().__init__(ax, t_axis)
+        self._is_list = is_list
 
-        self._dim = len(self.U.shape)
-        self._is_list = isinstance(U, list)
-
-        Slice = self._make_slice(0, self._dim)
         self.Q = self.ax.quiver(self.X, self.Y,
-                                self.U[Slice], self.V[Slice],
+                                self._get_frame(self.U, 0),
+                                self._get_frame(self.V, 0),
                                 **kwargs)
 
     def _update(self, i):
-        Slice = self._make_slice(i, self._dim)
-        self.Q.set_UVC(self.U[Slice], self.V[Slice])
+        self.Q.set_UVC(self._get_frame(self.U, i), self._get_frame(self.V, i))
         return self.Q
 
+    def _artists(self):
+        return [self.Q]
+
     def __len__(self):
-        if self._is_list:
-            return self.U.shape[0]
-        return self.U.shape[self.t_axis]
+        return self._len_of(self.U)
+
 
+def _unit(u, v, dtype):
+    """Returns u, v divided by their magnitude, masked where it is 0"""
+    magnitude = np.hypot(u, v, dtype=dtype)
+    zero = magnitude == 0
+    U = np.divide(u, magnitude, out=np.zeros(u.shape, dtype), where=~zero)
+    V = np.divide(v, magnitude, out=np.zeros(v.shape, dtype), where=~zero)
+    # quiver doesn't draw masked arrows
+    return (np.ma.masked_where(zero, U, copy=False),
+            np.ma.masked_where(zero, V, copy=False))
 
-def vector_comp(X, Y, U, V, skip=5, *, t_axis=0, pcolor_kw={}, quiver_kw={}):
+
+def vector_comp(X, Y, U, V, skip=5, *, t_axis=0, dtype=None, pcolor_kw={},
+                quiver_kw={}):
     """produces an animation of vector fields
 
     This takes 2D vector field, and plots the magnitude as a pcolomesh, and the
@@ -96,6 +119,10 @@ def vector_comp(X, Y, U, V, skip=5, *, t_axis=0, pcolor_kw={}, quiver_kw={}):
         The axis of the U, V array's the represent time. Defaults to 0. Note
         this is different from the defaults that blocks choose. This default
         is chosen to be consistent with 3D-meshgrids (meshgrid(x, y, t)).
+    dtype : numpy dtype, optional
+        The floating point type of the magnitude and the arrows. Defaults to
+        that of U and V (float64 if they are integers), so float32 data
+        stays float32.
     pcolor_kw : dict, optional
         A dictionary of parameters to pass to pcolormesh.
     quiver_kw : dict, optional
@@ -106,10 +133,19 @@ def vector_comp(X, Y, U, V, skip=5, *, t_axis=0, pcolor_kw={}, quiver_kw={}):
     list of Animatplot.blocks.Block
         A list of all the blocks used in the animation. The list
         contains a Pcolorblock, and a Quiver block in that order.
+
+    Notes
+    -----
+    Only the arrows that are shown are normalized, and the magnitude is
+    computed without temporary arrays, so the data only needs the memory of
+    the magnitude besides itself. Vectors of zero magnitude have no
+    direction, and are masked so that they have no arrow.
     """
-    # plot the magnitude of the vectors as a pcolormesh
-    magnitude = np.sqrt(U**2+V**2)
-    pcolor_block = Pcolormesh(X, Y, magnitude, t_axis=t_axis, **pcolor_kw)
+    if dtype is None:
+        dtype = np.result_type(U, V)
+        if not np.issubdtype(dtype, np.floating):
+            dtype = np.dtype(float)
+    dtype = np.dtype(dtype)
 
     # use a subset of the data to plot the arrows as a quiver plot.
     xy_slice = tuple([slice(None, None, skip)]*len(X.shape))
@@ -118,9 +154,33 @@ def vector_comp(X, Y, U, V, skip=5, *, t_axis=0, pcolor_kw={}, quiver_kw={}):
     uv_slice[t_axis] = slice(None)
     uv_slice = tuple(uv_slice)
 
-    quiver_block = Quiver(X[xy_slice], Y[xy_slice],
-                          U[uv_slice]/magnitude[uv_slice],
-                          V[uv_slice]/magnitude[uv_slice],
+    # the magnitude, and the normalized U, V of the arrows
+    nbytes = (U.size + 2*U[uv_slice].size) * dtype.itemsize
+    if memory._reserve(nbytes, "vector_comp", lazy=True):
+        magnitude = np.hypot(U, V, dtype=dtype)
+        U_arrows, V_arrows = _unit(U[uv_slice], V[uv_slice], dtype)
+    else:
+        # computed a frame at a time instead
+        length = U.shape[t_axis]
+        U, V = np.moveaxis(U, t_axis, 0), np.moveaxis(V, t_axis, 0)
+        t_axis = 0
+
+        def magnitude(i):
+            return np.hypot(U[i], V[i], dtype=dtype)
+
+        def arrows(component):
+            def frame(i):
+                return _unit(U[i][xy_slice], V[i][xy_slice],
+                             dtype)[component]
+            return frame
+        magnitude = FunctionSource(magnitude, length)
+        U_arrows = FunctionSource(arrows(0), length)
+        V_arrows = FunctionSource(arrows(1), length)
+
+    # plot the magnitude of the vectors as a pcolormesh
+    pcolor_block = Pcolormesh(X, Y, magnitude, t_axis=t_axis, **pcolor_kw)
+
+    quiver_block = Quiver(X[xy_slice], Y[xy_slice], U_arrows, V_arrows,
                           t_axis=t_axis, **quiver_kw)
 
     return [pcolor_block, quiver_block]
@@ -0,0 +1,208 @@
+"""A persistent cache of rendered frames, to save animations again quickly
+
+When an animation is saved with a :class:`DiskCache`, every frame is keyed
+by a hash of the data that each block displays for it, the state of the
+figure (the size, dpi, and every artist, as drawn for the first saved
+frame, leaving out the data of the animated artists) and the settings of
+the writer. Frames whose key is already in the cache are read from disk
+instead of being rendered again.
+"""
+import hashlib
+import os
+import tempfile
+import zlib
+
+from matplotlib.colors import Colormap
+from matplotlib.transforms import BboxBase
+import numpy as np
+
+_SUFFIX = '.rgba.z'
+
+# the state of artists that affects how they are drawn
+_GETTERS = [
+    'get_visible', 'get_alpha', 'get_zorder', 'get_position', 'get_xlim',
+    'get_ylim', 'get_xscale', 'get_yscale', 'get_text', 'get_fontsize',
+    'get_rotation', 'get_color', 'get_facecolor', 'get_edgecolor',
+    'get_linewidth', 'get_linestyle', 'get_marker', 'get_markersize',
+    'get_xydata', 'get_xy', 'get_offsets', 'get_sizes', 'get_array',
+    'get_coordinates', 'get_extent', 'get_cmap', 'get_clim',
+]
+# the state that changes from frame to frame, for the artists of blocks
+_FRAME_GETTERS = {
+    'get_xydata', 'get_xy', 'get_offsets', 'get_sizes', 'get_array',
+    'get_text',
+}
+
+
+class DiskCache:
+    """Keeps the rendered frames of animations on disk
+
+    Pass a cache to :meth:`animatplot.Animation.save` to reuse the frames
+    that haven't changed since an animation was last saved. Frames are
+    stored as compressed raw RGBA buffers, one file per frame, so the same
+    directory can be shared by several processes.
+
+    Parameters
+    ----------
+    path : str
+        The directory to keep the frames in. It is created if needed.
+    max_bytes : int, optional
+        After every save, the least recently used frames are deleted until
+        the frames take no more than this many bytes. By default there is
+        no limit.
+
+    Attributes
+    ----------
+    hits, misses : int
+        The number of frames read from the cache, and rendered.
+    evictions : int
+        The number of frames deleted to stay within max_bytes.
+
+    Examples
+    --------
+    >>> cache = amp.cache.DiskCache('.frames', max_bytes=2**30)
+    >>> anim.save('anim.gif', writer='pillow', cache=cache)
+    >>> print(cache.stats())
+    """
+    def __init__(self, path, max_bytes=None):
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.max_bytes = max_bytes
+        self.reset_stats()
+
+    def reset_stats(self):
+        """Sets the counts of hits, misses and evictions to 0"""
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    def _file(self, key):
+        return os.path.join(self.path, key + _SUFFIX)
+
+    def _files(self):
+        """Returns (last used, bytes, path) of every frame"""
+        files = []
+        for entry in os.scandir(self.path):
+            if entry.name.endswith(_SUFFIX):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        return files
+
+    def __contains__(self, key):
+        return os.path.exists(self._file(key))
+
+    def get(self, key):
+        """Returns the frame with a key, or None if it isn't cached"""
+        try:
+            with open(self._file(key), 'rb') as f:
+                data = zlib.decompress(f.read())
+            os.utime(self._file(key))
+        except (FileNotFoundError, zlib.error):
+            return None
+        self.hits += 1
+        return data
+
+    def put(self, key, data):
+        """Stores a frame"""
+        self.misses += 1
+        # written to a temporary file first, so readers never see part of it
+        fd, temp = tempfile.mkstemp(dir=self.path, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(zlib.compress(data, 1))
+        os.replace(temp, self._file(key))
+
+    def evict(self):
+        """Deletes the least recently used frames beyond max_bytes"""
+        if self.max_bytes is None:
+            return
+        files = sorted(self._files())
+        nbytes = sum(size for _, size, _ in files)
+        for _, size, path in files:
+            if nbytes <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            nbytes -= size
+            self.evictions += 1
+
+    def clear(self):
+        """Deletes every frame"""
+        for _, _, path in self._files():
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+    def stats(self):
+        """Returns the statistics of the cache
+
+        Returns
+        -------
+        dict
+            The ``hits``, ``misses`` and ``evictions`` so far, the
+            ``hit_rate``, and the number of ``frames`` on disk and the
+            ``nbytes`` they take.
+        """
+        files = self._files()
+        total = self.hits + self.misses
+        return {'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': self.hits / total if total else 0.,
+                'evictions': self.evictions,
+                'frames': len(files),
+                'nbytes': sum(size for _, size, _ in files)}
+
+
+def _digest(h, value):
+    """Adds a value, such as the data of a frame, to a hash"""
+    if isinstance(value, (list, tuple)):
+        h.update(b'(%d' % len(value))
+        for item in value:
+            _digest(h, item)
+        h.update(b')')
+        return
+    if isinstance(value, Colormap):
+        value = value.name
+    elif isinstance(value, BboxBase):
+        value = value.bounds
+    array = np.asanyarray(value)
+    if array.dtype == object:
+        h.update(repr(value).encode())
+        return
+    if isinstance(array, np.ma.MaskedArray):
+        _digest(h, np.ma.getmaskarray(array))
+        array = array.filled(0)
+    h.update(str((array.dtype.str, array.shape)).encode())
+    h.update(np.ascontiguousarray(array).tobytes())
+
+
+def _figure_key(fig, settings, animated=()):
+    """Returns a hash of the state of every artist of a figure
+
+    settings are those of the writer (e.g. the dpi), which also change the
+    rendered frames. Only the style of the animated artists is included,
+    as the data they display for each frame is hashed separately.
+    """
+    animated = {id(artist) for artist in animated}
+    h = hashlib.blake2b(digest_size=20)
+    _digest(h, repr(sorted(settings.items())))
+    _digest(h, tuple(fig.bbox.size))
+    for artist in fig.findobj():
+        h.update(type(artist).__name__.encode())
+        for getter in _GETTERS:
+            if id(artist) in animated and getter in _FRAME_GETTERS:
+                continue
+            method = getattr(artist, getter, None)
+            if method is None:
+                continue
+            try:
+                value = method()
+            except (TypeError, ValueError, AttributeError):
+                continue
+            _digest(h, value)
+    return h.digest()
@@ -0,0 +1,134 @@
+"""Accounting of the memory held by blocks, and an optional memory budget
+
+Blocks copy data given as lists into new arrays, and some composite blocks
+compute new arrays from their data (e.g. the magnitude in
+:func:`animatplot.blocks.vector_comp`). Within a :func:`budget`, blocks
+check that these copies fit before allocating them, and fall back to
+reading the data a frame at a time when they don't.
+"""
+from contextlib import contextmanager
+
+import numpy as np
+
+from animatplot.sources import FrameSource
+
+# the active budget, see budget()
+_budget = None
+
+
+class _Budget:
+    def __init__(self, max_bytes, lazy):
+        self.max_bytes = max_bytes
+        self.lazy = lazy
+        self.used = 0
+
+
+@contextmanager
+def budget(max_bytes, lazy=True):
+    """Limits the memory that blocks may allocate while they are created
+
+    Parameters
+    ----------
+    max_bytes : int
+        The most bytes that the blocks created within the context may
+        allocate for their data, in total.
+    lazy : bool, optional
+        If True (the default), blocks whose data doesn't fit read it a
+        frame at a time instead (see :mod:`animatplot.sources`) where they
+        can. Otherwise, or where they can't, a MemoryError is raised before
+        anything is allocated.
+
+    Examples
+    --------
+    >>> with amp.memory.budget(2**30):
+    ...     block = amp.blocks.Imshow(list_of_images)
+    """
+    global _budget
+    previous = _budget
+    _budget = _Budget(max_bytes, lazy)
+    try:
+        yield _budget
+    finally:
+        _budget = previous
+
+
+def _mib(nbytes):
+    return '{:.1f} MiB'.format(nbytes / 2**20)
+
+
+def _reserve(nbytes, what, lazy=False):
+    """Counts nbytes, about to be allocated for what, against the budget
+
+    Returns True if the allocation fits (or there is no budget). If it
+    doesn't, returns False when lazy is True and the budget allows falling
+    back to lazy data, and raises a MemoryError otherwise.
+    """
+    if _budget is None:
+        return True
+    if _budget.used + nbytes <= _budget.max_bytes:
+        _budget.used += nbytes
+        return True
+    if lazy and _budget.lazy:
+        return False
+    raise MemoryError(
+        "{} needs {}, which exceeds the memory budget of {} ({} already "
+        "used)".format(what, _mib(nbytes), _mib(_budget.max_bytes),
+                       _mib(_budget.used)))
+
+
+def _copy_nbytes(frames):
+    """Returns the bytes that np.asanyarray(frames) allocates for a list
+
+    Frames are converted one at a time, so that at most one frame is
+    copied while counting. Ragged frames only need an array of references.
+    """
+    shape = None
+    nbytes = 0
+    for frame in frames:
+        frame = np.asanyarray(frame)
+        if shape is not None and frame.shape != shape:
+            return 8 * len(frames)
+        shape = frame.shape
+        nbytes += frame.nbytes
+    return nbytes
+
+
+def _nbytes(data, seen):
+    """Returns the bytes (owned, views) held by data
+
+    Owned bytes belong to arrays that own their memory. Views count the
+    memory that views of other arrays keep alive (including memory-mapped
+    files). Memory whose id is in seen is skipped, and then added to it.
+    """
+    owned = views = 0
+    if isinstance(data, np.ndarray):
+        if data.dtype == object:
+            if id(data) not in seen:
+                seen.add(id(data))
+                owned += data.nbytes
+            for item in data.flat:
+                o, v = _nbytes(item, seen)
+                owned, views = owned + o, views + v
+            return owned, views
+        root = data
+        while isinstance(root.base, np.ndarray):
+            root = root.base
+        if id(root) not in seen:
+            seen.add(id(root))
+            if root.base is None:
+                if root is data:
+                    owned += root.nbytes
+                else:
+                    views += root.nbytes
+            else:
+                # memory owned by something else, such as a mapped file
+                views += root.nbytes
+    elif isinstance(data, FrameSource):
+        return _nbytes(list(vars(data).values()), seen)
+    elif isinstance(data, (list, tuple, dict)):
+        if isinstance(data, dict):
+            data = list(data.values())
+        for item in data:
+            o, v = _nbytes(item, seen)
+            owned, views = owned + o, views + v
+    return owned, views
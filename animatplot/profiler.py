@@ -0,0 +1,127 @@
+import time
+
+import numpy as np
+
+
+class Profiler:
+    """Records how long each part of every frame of an animation takes
+
+    Pass a profiler to :class:`animatplot.Animation` to time every frame
+    that is displayed, scrubbed to with the slider, or saved. The parts
+    that are timed are:
+
+    - the update of every block, named by its position and type,
+      e.g. ``'0:Line'``
+    - ``'slider'``: moving the timeline slider to the frame
+    - ``'draw'``: drawing the figure, until the canvas reports that it is
+      drawn. For interactive backends this includes waiting for the GUI to
+      draw the canvas.
+    - ``'write'``: while saving, the time the writer takes to encode and
+      write the frame after it is drawn
+    - ``'render'``: while saving with several ``workers``, the time a worker
+      process took to update and draw the frame, in place of the block
+      updates, ``'slider'`` and ``'draw'``
+    - ``'cache'``: while saving with a ``cache``, the time taken to read a
+      frame that was already rendered
+
+    Parameters
+    ----------
+    frame_callback : callable, optional
+        Called as ``frame_callback(frame, timings)`` after every frame,
+        where timings is a dict of the seconds spent in each part.
+    progress_callback : callable, optional
+        Called while saving as
+        ``progress_callback(frame_number, total_frames, eta)`` once every
+        frame is updated, where eta is the estimated number of seconds left
+        (None if the number of frames is unknown).
+
+    Attributes
+    ----------
+    timings : dict
+        The seconds spent in each part, for every frame it was part of.
+
+    Examples
+    --------
+    >>> profiler = amp.Profiler()
+    >>> anim = amp.Animation(blocks, profiler=profiler)
+    >>> anim.save_gif('test')
+    >>> print(profiler.summary())
+    """
+    def __init__(self, frame_callback=None, progress_callback=None):
+        self.frame_callback = frame_callback
+        self.progress_callback = progress_callback
+        self.reset()
+
+    def reset(self):
+        """Forgets all of the frames timed so far"""
+        self.timings = {}
+        self._frame = None
+        self._current = {}
+        self._save_start = None
+
+    def _record(self, part, seconds):
+        if self._frame is not None:
+            self._current[part] = self._current.get(part, 0) + seconds
+
+    def _start_frame(self, frame):
+        self._end_frame()
+        self._frame = frame
+
+    def _end_frame(self):
+        if self._frame is None:
+            return
+        for part, seconds in self._current.items():
+            self.timings.setdefault(part, []).append(seconds)
+        if self.frame_callback is not None:
+            self.frame_callback(self._frame, self._current)
+        self._frame = None
+        self._current = {}
+
+    def _start_save(self):
+        self._save_start = time.perf_counter()
+
+    def _save_progress(self, frame_number, total_frames):
+        if self.progress_callback is None:
+            return
+        eta = None
+        if total_frames is not None:
+            elapsed = time.perf_counter() - self._save_start
+            done = frame_number + 1
+            eta = elapsed / done * (total_frames - done)
+        self.progress_callback(frame_number, total_frames, eta)
+
+    def stats(self):
+        """Returns statistics of the time taken by each part
+
+        Returns
+        -------
+        dict
+            Maps every part to a dict of the ``count`` of frames, and the
+            ``total``, ``mean``, ``p50``, ``p95`` and ``max`` seconds.
+        """
+        stats = {}
+        for part, seconds in self.timings.items():
+            seconds = np.asarray(seconds)
+            p50, p95 = np.percentile(seconds, [50, 95])
+            stats[part] = {'count': len(seconds),
+                           'total': float(seconds.sum()),
+                           'mean': float(seconds.mean()),
+                           'p50': float(p50),
+                           'p95': float(p95),
+                           'max': float(seconds.max())}
+        return stats
+
+    def summary(self):
+        """Returns a table of the statistics, slowest part first"""
+        stats = sorted(self.stats().items(),
+                       key=lambda item: item[1]['total'], reverse=True)
+        width = max([len('part')] + [len(part) for part, _ in stats])
+        columns = ['count', 'total', 'mean', 'p50', 'p95', 'max']
+        lines = ['{:<{}}'.format('part', width)
+                 + ''.join('{:>10}'.format(c) for c in columns)]
+        for part, stat in stats:
+            line = '{:<{}}{:>10}'.format(part, width, stat['count'])
+            line += ''.join('{:>8.2f}ms'.format(1000 * stat[c])
+                            for c in columns[1:])
+            lines.append(line)
+        return '\n'.join(lines)
@@ -0,0 +1,505 @@
+from concurrent.futures import Future, ThreadPoolExecutor
+import sys
+import threading
+
+import numpy as np
+
+
+class FrameSource:
+    """A base class for lazily evaluated frames
+
+    A frame source can be passed to a block in place of the full array of
+    data. The block then only requests frame ``i`` when it is displayed, so
+    the data never has to be held in memory all at once.
+
+    Subclasses must implement ``__len__`` and ``_get_frame``.
+    """
+    def __len__(self):
+        """Returns the number of frames"""
+        raise NotImplementedError()
+
+    def _get_frame(self, i):
+        """Returns frame i, where 0 <= i < len(self)
+
+        To be implemented by subclasses
+        """
+        raise NotImplementedError()
+
+    def __getitem__(self, i):
+        length = len(self)
+        i = int(i)
+        if i < 0:
+            i += length
+        if not 0 <= i < length:
+            raise IndexError("frame {} is out of range for a source of "
+                             "length {}".format(i, length))
+        return self._get_frame(i)
+
+
+class FunctionSource(FrameSource):
+    """Frames generated by calling a function
+
+    Parameters
+    ----------
+    func : callable
+        Called as ``func(i)`` to produce frame i.
+    length : int
+        The number of frames.
+    """
+    def __init__(self, func, length):
+        self.func = func
+        self._length = length
+
+    def __len__(self):
+        return self._length
+
+    def _get_frame(self, i):
+        return self.func(i)
+
+
+class SequenceSource(FrameSource):
+    """Frames read from any object that supports ``len`` and indexing
+
+    Parameters
+    ----------
+    seq : object
+        An object where ``seq[i]`` returns frame i, such as a list of
+        arrays, or an object that reads its frames from disk.
+    """
+    def __init__(self, seq):
+        self.seq = seq
+
+    def __len__(self):
+        return len(self.seq)
+
+    def _get_frame(self, i):
+        return self.seq[i]
+
+
+class IterSource(FrameSource):
+    """Frames produced by an iterator, such as a generator
+
+    Frames are consumed in order, and only the current frame is kept.
+    Skipping ahead consumes the frames in between. Going back to an earlier
+    frame (e.g. when the animation repeats) restarts the iteration, which
+    is only possible when a callable returning a new iterator is given.
+
+    Parameters
+    ----------
+    iterable : iterable or callable
+        Either an iterable of frames, or a function that takes no
+        arguments and returns a new iterable of frames.
+    length : int
+        The number of frames.
+    """
+    def __init__(self, iterable, length):
+        if callable(iterable):
+            self._factory = iterable
+            self._iterator = None
+        else:
+            self._factory = None
+            self._iterator = iter(iterable)
+        self._length = length
+        self._index = -1
+        self._frame = None
+
+    def __len__(self):
+        return self._length
+
+    def _restart(self):
+        if self._factory is None:
+            raise IndexError("Cannot go back to an earlier frame of an "
+                             "iterator. Pass a function that returns a new "
+                             "iterator to allow restarting.")
+        self._iterator = iter(self._factory())
+        self._index = -1
+
+    def _get_frame(self, i):
+        if i < self._index or self._iterator is None:
+            self._restart()
+        while self._index < i:
+            try:
+                self._frame = next(self._iterator)
+            except StopIteration:
+                raise IndexError("The iterator ran out after {} frames"
+                                 .format(self._index+1)) from None
+            self._index += 1
+        return self._frame
+
+
+class RaggedSource(FrameSource):
+    """Frames of different lengths, stored flat in a single array
+
+    All of the frames are concatenated into one array of values, and frame
+    i is the view ``values[offsets[i]:offsets[i+1]]``. This takes a single
+    pair of arrays instead of an object per frame, so it is compact, and
+    quick to pickle or send to other processes.
+
+    Parameters
+    ----------
+    values : array_like
+        The values of all of the frames, one after another.
+    offsets : 1D array_like of int
+        Where each frame starts in values, followed by the total number of
+        values. Starts at 0, and never decreases.
+
+    Examples
+    --------
+    >>> source = RaggedSource([1, 2, 3, 4, 5], [0, 2, 5])
+    >>> source[1]
+    array([3, 4, 5])
+    """
+    def __init__(self, values, offsets):
+        self.values = np.asanyarray(values)
+        self.offsets = np.asarray(offsets, dtype=np.int64)
+        if self.offsets.ndim != 1 or len(self.offsets) == 0:
+            raise ValueError("offsets must be a 1D array of at least one "
+                             "index")
+        if (self.offsets[0] != 0 or self.offsets[-1] != len(self.values)
+                or np.any(np.diff(self.offsets) < 0)):
+            raise ValueError("offsets must start at 0, never decrease, and "
+                             "end at the number of values")
+
+    @classmethod
+    def from_frames(cls, frames):
+        """Concatenates a sequence of frames into a RaggedSource"""
+        frames = [np.asanyarray(frame) for frame in frames]
+        offsets = np.zeros(len(frames) + 1, dtype=np.int64)
+        np.cumsum([len(frame) for frame in frames], out=offsets[1:])
+        values = np.concatenate(frames) if frames else np.empty(0)
+        return cls(values, offsets)
+
+    @property
+    def lengths(self):
+        """The length of every frame"""
+        return np.diff(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def _get_frame(self, i):
+        return self.values[self.offsets[i]:self.offsets[i+1]]
+
+
+# Aim for chunks of roughly this many bytes when no chunk size is given
+_CHUNK_BYTES = 32 * 2**20
+
+
+def _is_on_disk(data):
+    """Returns True for memory-mapped arrays and HDF5 datasets"""
+    if isinstance(data, np.memmap):
+        return True
+    # h5py is optional, but it must already be imported to have a dataset
+    h5py = sys.modules.get('h5py')
+    return h5py is not None and isinstance(data, h5py.Dataset)
+
+
+class ChunkedSource(FrameSource):
+    """Frames read from an on-disk array in chunks of time
+
+    Reading a single frame of a memory-mapped array, or an HDF5 dataset,
+    touches the file wherever that frame happens to be laid out, which is
+    very slow when time is not the first axis. Instead, several consecutive
+    frames are read at once with a single slice along the time axis, and
+    kept in memory as a time-major array.
+
+    Optionally, a background thread reads ahead, so that the next
+    ``read_ahead`` frames are already in memory while the current one is
+    drawn.
+
+    Parameters
+    ----------
+    data : array_like
+        Any array that supports slicing and has a ``shape`` and ``dtype``,
+        such as a numpy.memmap or a h5py.Dataset.
+    t_axis : int, optional
+        The axis of the array that represents time. Defaults to 0.
+    chunk_size : int, optional
+        The number of frames to read at once. Defaults to as many frames as
+        fit in roughly 32 MiB.
+    read_ahead : int, optional
+        The number of frames after the current one to load in the
+        background. Defaults to 0, which reads chunks only when needed.
+    """
+    def __init__(self, data, t_axis=0, chunk_size=None, read_ahead=0):
+        self.data = data
+        self.t_axis = t_axis
+        self._length = data.shape[t_axis]
+
+        if chunk_size is None:
+            frame_bytes = np.dtype(data.dtype).itemsize * max(
+                1, int(np.prod(data.shape)) // max(1, self._length))
+            chunk_size = _CHUNK_BYTES // frame_bytes
+        self.chunk_size = int(min(max(1, chunk_size), max(1, self._length)))
+        self.read_ahead = read_ahead
+
+        self._chunks = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1) if read_ahead else None
+
+    def __len__(self):
+        return self._length
+
+    def __getstate__(self):
+        # the thread and the loaded chunks are not sent along when pickling
+        state = self.__dict__.copy()
+        del state['_chunks'], state['_lock'], state['_executor']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._chunks = {}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(1) if self.read_ahead else None
+
+    def _read_chunk(self, n):
+        start = n * self.chunk_size
+        stop = min(start + self.chunk_size, self._length)
+        Slice = [slice(None)]*len(self.data.shape)
+        Slice[self.t_axis] = slice(start, stop)
+        chunk = np.asarray(self.data[tuple(Slice)])
+        # always a copy, as slicing a memmap only maps the frames, leaving
+        # them to be read from disk when they are displayed
+        return np.array(np.moveaxis(chunk, self.t_axis, 0), order='C')
+
+    def _chunk(self, n):
+        with self._lock:
+            chunk = self._chunks.get(n)
+            if chunk is None:
+                chunk = self._chunks[n] = self._read_chunk(n)
+        if isinstance(chunk, Future):
+            chunk = chunk.result()
+        return chunk
+
+    def _prefetch(self, i):
+        """Starts reading the chunks needed for frames i to i+read_ahead"""
+        wanted = []
+        for j in range(i, i + self.read_ahead + 1):
+            n = (j % self._length) // self.chunk_size
+            if n not in wanted:
+                wanted.append(n)
+        with self._lock:
+            for n in wanted:
+                if n not in self._chunks:
+                    self._chunks[n] = self._executor.submit(self._read_chunk, n)
+            for n in list(self._chunks):
+                if n not in wanted:
+                    chunk = self._chunks.pop(n)
+                    if isinstance(chunk, Future):
+                        chunk.cancel()
+
+    def _get_frame(self, i):
+        n = i // self.chunk_size
+        chunk = self._chunk(n)
+        if self._executor is not None:
+            self._prefetch(i)
+        else:
+            with self._lock:
+                for m in list(self._chunks):
+                    if m != n:
+                        del self._chunks[m]
+        return chunk[i - n*self.chunk_size]
+
+    def close(self):
+        """Stops the read ahead thread and releases the loaded chunks"""
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+        self._chunks.clear()
+
+
+class QuantizedSource(FrameSource):
+    """Frames stored as unsigned integers, and decoded as they are displayed
+
+    Every value is stored as the integer code ``round((value -
+    offset)/scale)``, and frames are decoded back to
+    ``code*scale + offset``. The largest code is reserved for NaN. A uint16
+    code takes a quarter of the memory of a float64, and is accurate to
+    ``scale/2`` (1/131068th of the range of the data), far finer than the
+    256 colors of a colormap.
+
+    Parameters
+    ----------
+    codes : array of unsigned int
+        The codes of all of the frames, with time as the first axis.
+    scale, offset : float
+        Maps codes back to values.
+    dtype : numpy dtype, optional
+        The floating point type of the decoded frames. Defaults to float32.
+    """
+    def __init__(self, codes, scale, offset, dtype=np.float32):
+        self.codes = np.asarray(codes)
+        if self.codes.dtype.kind != 'u':
+            raise TypeError("codes must be an array of unsigned integers")
+        self.scale = scale
+        self.offset = offset
+        self.dtype = np.dtype(dtype)
+
+    @classmethod
+    def from_array(cls, data, t_axis=0, dtype=np.uint16, chunk_size=None):
+        """Quantizes an array of floating point frames
+
+        The range of the codes covers the finite values of data. NaNs are
+        kept, and infinite values are clipped to the range. The data is
+        read chunk_size frames at a time, so no full-size temporaries are
+        created.
+        """
+        dtype = np.dtype(dtype)
+        if dtype.kind != 'u':
+            raise TypeError("dtype must be an unsigned integer type")
+        data = np.moveaxis(np.asanyarray(data), t_axis, 0)
+        if chunk_size is None:
+            frame_bytes = max(data[0].nbytes, 1) if len(data) else 1
+            chunk_size = max(1, _CHUNK_BYTES // frame_bytes)
+        chunks = [slice(start, start+chunk_size)
+                  for start in range(0, len(data), chunk_size)]
+
+        low, high = np.inf, -np.inf
+        for chunk in chunks:
+            finite = data[chunk][np.isfinite(data[chunk])]
+            if finite.size:
+                low = min(low, float(finite.min()))
+                high = max(high, float(finite.max()))
+        if low > high:
+            low = high = 0.
+        nan_code = np.iinfo(dtype).max
+        scale = (high - low) / (nan_code - 1) if high > low else 1.
+        offset = low
+
+        codes = np.empty(data.shape, dtype)
+        for chunk in chunks:
+            values = data[chunk].astype(np.float64)
+            values -= offset
+            values /= scale
+            np.clip(values, 0, nan_code - 1, out=values)
+            np.rint(values, out=values)
+            values[np.isnan(values)] = nan_code
+            codes[chunk] = values
+        return cls(codes, scale, offset)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def _get_frame(self, i):
+        codes = self.codes[i]
+        frame = codes.astype(self.dtype)
+        frame *= self.scale
+        frame += self.offset
+        frame[codes == np.iinfo(self.codes.dtype).max] = np.nan
+        return frame
+
+
+class RingSource(FrameSource):
+    """The latest frames appended to it, up to a fixed number of frames
+
+    Frames are appended while an animation plays (see
+    :meth:`animatplot.Timeline.live`), and once ``capacity`` frames are
+    held, every new frame replaces the oldest one, so that the memory
+    taken stays the same. Frame 0 is always the oldest frame held. Blocks
+    draw their first frame when they are created, so a RingSource given
+    to a block must already hold at least one frame.
+
+    Numeric frames of the same shape and dtype as the first one are copied
+    into a single array of ``capacity`` frames, allocated once. Other
+    frames (of varying lengths, or strings) are kept as they are given, in
+    ``capacity`` slots.
+
+    Parameters
+    ----------
+    capacity : int
+        The most frames to hold.
+    frames : iterable, optional
+        Frames to start with.
+
+    Attributes
+    ----------
+    capacity : int
+        The most frames held.
+    total : int
+        The number of frames appended so far, including those dropped.
+
+    Examples
+    --------
+    >>> source = RingSource(3, [[0, 0], [1, 1]])
+    >>> source.extend([[2, 2], [3, 3]])
+    >>> len(source), source[0]
+    (3, array([1, 1]))
+    """
+    def __init__(self, capacity, frames=()):
+        if int(capacity) < 1:
+            raise ValueError("capacity must be at least 1")
+        self.capacity = int(capacity)
+        self.total = 0
+        self._start = 0
+        self._length = 0
+        self._buffer = None
+        self._slots = None
+        self._lock = threading.Lock()
+        self.extend(frames)
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def __len__(self):
+        return self._length
+
+    @property
+    def first(self):
+        """The number of the oldest frame held, counting every frame
+        appended"""
+        return self.total - self._length
+
+    def _to_slots(self):
+        """Moves the frames out of the buffer, for frames that don't fit"""
+        self._slots = [None] * self.capacity
+        for i in range(self._length):
+            j = (self._start + i) % self.capacity
+            self._slots[j] = self._buffer[j].copy()
+        self._buffer = None
+
+    def append(self, frame):
+        """Appends a frame, dropping the oldest one when full"""
+        array = np.asanyarray(frame)
+        numeric = array.dtype.kind in 'biufc'
+        with self._lock:
+            if self._buffer is None and self._slots is None:
+                if numeric:
+                    self._buffer = np.empty((self.capacity,) + array.shape,
+                                            array.dtype)
+                else:
+                    self._slots = [None] * self.capacity
+            elif self._buffer is not None and (
+                    array.shape != self._buffer.shape[1:]
+                    or array.dtype != self._buffer.dtype):
+                self._to_slots()
+
+            j = (self._start + self._length) % self.capacity
+            if self._buffer is not None:
+                self._buffer[j] = array
+            else:
+                # copied so that changes to the frame given aren't seen
+                self._slots[j] = array.copy() if numeric else frame
+            if self._length < self.capacity:
+                self._length += 1
+            else:
+                self._start = (self._start + 1) % self.capacity
+            self.total += 1
+
+    def extend(self, frames):
+        """Appends every frame of an iterable"""
+        for frame in frames:
+            self.append(frame)
+
+    def _get_frame(self, i):
+        with self._lock:
+            j = (self._start + i) % self.capacity
+            if self._buffer is not None:
+                # a copy, as the slot is written over once the buffer is full
+                return self._buffer[j].copy()
+            return self._slots[j]
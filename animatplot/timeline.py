@@ -1,3 +1,5 @@
+import copy
+
 import numpy as np
 from animatplot.util import demeshgrid
 
@@ -37,6 +39,124 @@ class Timeline:
         self.index = 0
 
         self._len = len(self.t)
+        # the number of frames of data, and the frame of data displayed at
+        # each index of the timeline (None if they are the same)
+        self._data_len = self._len
+        self._frames = None
+        # see Timeline.live
+        self._live = False
+        self.capacity = None
+        self.follow = False
+        self._appended = 0
+
+    @classmethod
+    def live(cls, t, capacity=None, follow=True, units='', fps=10,
+             log=False):
+        """Creates a timeline that times can be appended to as it plays
+
+        Live timelines are for monitoring data as it is produced, e.g. by
+        a running simulation. Frames are appended to the blocks (see
+        :meth:`animatplot.blocks.Block.append`) and their times to the
+        timeline with :meth:`append`, while the animation plays.
+
+        Parameters
+        ----------
+        t : 1D array_like
+            The times of the frames to start with. Blocks need their first
+            frame to draw their artists, so there must be at least one.
+        capacity : int, optional
+            The most frames to keep. Once there are this many, the oldest
+            frame is dropped for every new one. Should match the capacity
+            of the :class:`animatplot.sources.RingSource` of the blocks.
+            By default the timeline grows without limit.
+        follow : bool, optional
+            If True, the newest frame is always displayed. Otherwise the
+            animation plays through the frames, and waits at the newest
+            one for more. Defaults to True.
+        units, fps, log : optional
+            As for a Timeline.
+
+        Returns
+        -------
+        Timeline
+        """
+        timeline = cls(t, units, fps, log)
+        if timeline.t.ndim != 1 or not len(timeline.t):
+            raise ValueError("A live timeline needs the 1D times of at "
+                             "least one frame to start with")
+        if capacity is not None:
+            if int(capacity) < 1:
+                raise ValueError("capacity must be at least 1")
+            capacity = int(capacity)
+        timeline._live = True
+        timeline.capacity = capacity
+        timeline.follow = follow
+        timeline._buffer = np.array(timeline.t)
+        timeline._start = 0
+        timeline._resize(0, 0)
+        if capacity is not None and timeline._len > capacity:
+            timeline._resize(timeline._len - capacity, 0)
+        if follow:
+            timeline.index = timeline._len - 1
+        return timeline
+
+    def _resize(self, dropped, added):
+        """Drops the oldest times and makes room for new ones, keeping the
+        times in self.t, a view of a larger buffer"""
+        length = self._len - dropped + added
+        start = self._start + dropped
+        if start + length > len(self._buffer):
+            # move the times to the start of a buffer with room to spare,
+            # so that this only happens every so many appends
+            size = max(2 * length, 16)
+            if self.capacity is not None:
+                size = max(size, 2 * self.capacity)
+            buffer = np.empty(size, self._buffer.dtype)
+            buffer[:self._len - dropped] = self.t[dropped:]
+            self._buffer, start = buffer, 0
+        self._start = start
+        self.t = self._buffer[start:start + length]
+        self._len = self._data_len = length
+
+    def append(self, t):
+        """Appends the time of a frame, or of several frames, to a live
+        timeline
+
+        See :meth:`Timeline.live`. Append the frames to the blocks first,
+        so that they are there to be displayed.
+
+        Parameters
+        ----------
+        t : scalar or 1D array_like
+            The time, or times, to append.
+        """
+        if not self._live:
+            raise ValueError("Only live timelines can be appended to, see "
+                             "Timeline.live")
+        t = np.atleast_1d(np.asanyarray(t))
+        if t.ndim != 1:
+            raise ValueError("t must be a scalar or 1D")
+        if self.log:
+            t = np.log10(t)
+        dtype = np.result_type(self._buffer, t)
+        if dtype != self._buffer.dtype:
+            # e.g. float times appended to integer ones
+            self._buffer = self._buffer.astype(dtype)
+            self.t = self._buffer[self._start:self._start + self._len]
+        self._appended += len(t)
+        if self.capacity is not None and len(t) > self.capacity:
+            t = t[-self.capacity:]
+        dropped = 0
+        if self.capacity is not None:
+            dropped = max(0, self._len + len(t) - self.capacity)
+        old = self._len - dropped
+        self._resize(dropped, len(t))
+        self.t[old:] = t
+        if self.follow:
+            self.index = self._len - 1
+        else:
+            # the frame displayed moves along with the frames dropped
+            self.index = max(self.index - dropped, 0)
 
     def __getitem__(self, i):
         return self.t.__getitem__(i)
@@ -52,4 +172,93 @@ class Timeline:
 
     def _update(self):
         """Increments the current time."""
+        if self._live:
+            # waits at the newest frame for more
+            if self.follow:
+                self.index = self._len - 1
+            else:
+                self.index = min(self.index + 1, self._len - 1)
+            return
         self.index = (self.index + 1) % self._len
+
+    def _frame(self, index):
+        """Returns the frame of data to display at an index of the timeline
+
+        This is a float if the timeline was linearly resampled.
+        """
+        if self._frames is None:
+            return index
+        return self._frames[index].item()
+
+    def _frame_indices(self):
+        if self._frames is None:
+            return np.arange(self._len)
+        return self._frames
+
+    def _with_frames(self, t, frames):
+        if self._live:
+            raise ValueError("Frames can't be selected from a live timeline")
+        timeline = copy.copy(self)
+        timeline.t = t
+        timeline._len = len(t)
+        timeline._frames = frames
+        timeline.index = 0
+        return timeline
+
+    def select(self, start=None, stop=None, step=None):
+        """Returns a timeline that only displays some of the frames
+
+        The data of the blocks is not copied, they are simply told which
+        frames to display.
+
+        Parameters
+        ----------
+        start, stop, step : int, optional
+            Select the frames ``start:stop:step``, in the same way as
+            slicing a list.
+
+        Returns
+        -------
+        Timeline
+        """
+        Slice = slice(start, stop, step)
+        return self._with_frames(self.t[Slice], self._frame_indices()[Slice])
+
+    def resample(self, t, method='nearest'):
+        """Returns a timeline that displays the frames at the times t
+
+        Parameters
+        ----------
+        t : 1D array_like
+            The times to display, in the same units as the timeline.
+            The times of the timeline must be increasing.
+        method : {'nearest', 'linear'}, optional
+            'nearest' displays the frame closest in time. 'linear'
+            interpolates between the two frames around each time, for blocks
+            whose data can be interpolated (the others display the nearest
+            frame). Defaults to 'nearest'.
+
+        Returns
+        -------
+        Timeline
+        """
+        t = np.asanyarray(t)
+        if self.log:
+            t = np.log10(t)
+        if np.issubdtype(self.t.dtype, np.datetime64) or \
+                np.issubdtype(self.t.dtype, np.timedelta64):
+            t = t.astype(self.t.dtype)
+            old_times = self.t.astype('int64').astype(float)
+            new_times = t.astype('int64').astype(float)
+        else:
+            old_times, new_times = self.t, t
+
+        positions = np.interp(new_times, old_times, np.arange(self._len))
+        if method == 'nearest':
+            frames = self._frame_indices()[np.rint(positions).astype(int)]
+        elif method == 'linear':
+            frames = np.interp(positions, np.arange(self._len),
+                               self._frame_indices())
+        else:
+            raise ValueError("method must be either 'nearest' or 'linear'")
+        return self._with_frames(t, frames)
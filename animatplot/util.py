@@ -1,8 +1,15 @@
 import numpy as np
 
+from animatplot import memory
+
 
 def parametric_line(x, y):
-    """
+    """Turns a parametric line into the 2D arrays of a growing line
+
+    Row i of the returned arrays contains the first i+1 points of the line,
+    and is padded with NaN. Note that the result is of size n x n; the
+    :class:`animatplot.blocks.ParametricLine` block does not need it.
+
     Parameters
     ----------
     x : 1D numpy array
@@ -11,12 +18,21 @@ def parametric_line(x, y):
     if len(x) != len(y):
         raise ValueError("Arrays must be the same length")
 
-    X = np.ones((len(x), len(x)))*np.nan
-    Y = X.copy()
+    n = len(x)
+    memory._reserve(2 * n*n * np.dtype(float).itemsize, "parametric_line")
+    X = np.empty((n, n))
+    Y = np.empty((n, n))
 
-    for i in range(len(x)):
-        X[i, :(i+1)] = x[:(i+1)]
-        Y[i, :(i+1)] = y[:(i+1)]
+    # fill a block of rows at a time to bound the size of the mask
+    cols = np.arange(n)
+    step = max(1, 2**20 // max(n, 1))
+    for start in range(0, n, step):
+        stop = min(start+step, n)
+        after = cols > np.arange(start, stop)[:, None]
+        X[start:stop] = x
+        Y[start:stop] = y
+        X[start:stop][after] = np.nan
+        Y[start:stop][after] = np.nan
     return X, Y
 
 
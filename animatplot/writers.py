@@ -0,0 +1,138 @@
+import os
+import subprocess
+import tempfile
+
+import matplotlib as mpl
+from matplotlib import cbook
+from matplotlib.animation import FFMpegWriter, writers
+from matplotlib.backends.backend_agg import RendererAgg
+
+
+@writers.register('ffmpeg_raw')
+class FFMpegRawWriter(FFMpegWriter):
+    """Pipe-based ffmpeg writer that streams the Agg buffer directly
+
+    Rather than going through ``savefig`` for every frame, the figure is
+    drawn into a private Agg renderer, and its RGBA buffer is written
+    straight to the stdin of ffmpeg without being copied or encoded. Writes
+    block while the pipe is full, so rendering never gets ahead of ffmpeg.
+
+    Used like any other matplotlib writer, or by name:
+    ``anim.save('name.mp4', writer='ffmpeg_raw')``
+
+    Parameters
+    ----------
+    fps : int, optional
+        Movie frame rate (per second).
+    codec : str, optional
+        The codec to use. Defaults to :rc:`animation.codec`.
+    bitrate : int, optional
+        The bitrate of the movie, in kilobits per second.
+    extra_args : list of str, optional
+        Extra command-line arguments passed to ffmpeg.
+    metadata : dict, optional
+        Metadata to include in the output file.
+
+    Notes
+    -----
+    Only the ``facecolor`` and ``edgecolor`` keyword arguments of
+    ``savefig`` are supported when grabbing frames.
+    """
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+        self._renderer = None
+
+    def _render(self):
+        """Draws the figure and returns a view of the RGBA buffer"""
+        fig = self.fig
+        width, height = self.frame_size
+        if self._renderer is None or (
+                (self._renderer.width, self._renderer.height) != (width, height)):
+            self._renderer = RendererAgg(width, height, self.dpi)
+        self._renderer.clear()
+
+        dpi = fig.dpi
+        fig.dpi = self.dpi
+        try:
+            # like savefig, so that animated (blitted) artists are drawn
+            with cbook._setattr_cm(fig.canvas, _is_saving=True):
+                fig.draw(self._renderer)
+        finally:
+            fig.dpi = dpi
+        return memoryview(self._renderer.buffer_rgba())
+
+    def grab_frame(self, **savefig_kwargs):
+        fig = self.fig
+        # All frames must have the same size to save the movie correctly.
+        fig.set_size_inches(self._w, self._h)
+
+        colors = {key: savefig_kwargs.pop(key) for key in
+                  ('facecolor', 'edgecolor') if key in savefig_kwargs}
+        savefig_kwargs.pop('transparent', None)
+        if savefig_kwargs:
+            raise TypeError("FFMpegRawWriter does not support the savefig "
+                            "arguments: {}".format(', '.join(savefig_kwargs)))
+
+        original = {key: getattr(fig, 'get_' + key)() for key in colors}
+        for key, color in colors.items():
+            getattr(fig, 'set_' + key)(color)
+        try:
+            frame = self._render()
+        finally:
+            for key, color in original.items():
+                getattr(fig, 'set_' + key)(color)
+        self._proc.stdin.write(frame)
+
+
+def concat_segments(segments, filename):
+    """Joins segments of an animation into one file, without re-encoding them
+
+    The segments are typically saved by separate processes with
+    ``Animation.save(start=..., stop=...)``, and must all have been saved
+    with the same writer and settings. The frames of GIFs are joined with
+    Pillow. Other formats are joined by the concat demuxer of ffmpeg
+    (found at :rc:`animation.ffmpeg_path`), which copies the encoded
+    streams.
+
+    Parameters
+    ----------
+    segments : list of str
+        The files of the segments, in order.
+    filename : str
+        The file to be created.
+    """
+    if not segments:
+        raise ValueError("There are no segments to join")
+    if filename.lower().endswith('.gif'):
+        _concat_gifs(segments, filename)
+        return
+
+    with tempfile.NamedTemporaryFile('w', suffix='.txt',
+                                     delete=False) as listing:
+        for segment in segments:
+            path = os.path.abspath(segment).replace("'", "'\\''")
+            listing.write("file '{}'\n".format(path))
+    try:
+        subprocess.run([mpl.rcParams['animation.ffmpeg_path'], '-y',
+                        '-loglevel', 'error', '-f', 'concat', '-safe', '0',
+                        '-i', listing.name, '-c', 'copy', filename],
+                       check=True)
+    finally:
+        os.remove(listing.name)
+
+
+def _concat_gifs(segments, filename):
+    from PIL import Image, ImageSequence
+
+    frames = []
+    durations = []
+    for segment in segments:
+        with Image.open(segment) as im:
+            if not frames:
+                loop = im.info.get('loop')
+            for frame in ImageSequence.Iterator(im):
+                durations.append(frame.info.get('duration', 0))
+                frames.append(frame.copy())
+    kwargs = {} if loop is None else {'loop': loop}
+    frames[0].save(filename, save_all=True, append_images=frames[1:],
+                   duration=durations, **kwargs)
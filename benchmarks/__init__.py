@@ -0,0 +1,3 @@
+"""Benchmarks of animatplot, to be run with airspeed velocity (asv)"""
+import matplotlib
+matplotlib.use('Agg')
@@ -0,0 +1,64 @@
+"""Benchmarks of saving animations with the Agg backend"""
+from io import BytesIO
+import time
+
+from matplotlib.animation import AbstractMovieWriter
+import matplotlib.pyplot as plt
+import numpy as np
+
+import animatplot as amp
+
+N_FRAMES = 20
+
+
+class _RawWriter(AbstractMovieWriter):
+    """Renders every frame to a raw RGBA buffer, which is thrown away
+
+    This measures everything that saving takes, except for the encoding.
+    """
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi=dpi)
+
+    def grab_frame(self, **savefig_kwargs):
+        self.fig.savefig(BytesIO(), format='rgba', dpi=self.dpi,
+                         **savefig_kwargs)
+
+    def finish(self):
+        pass
+
+
+class Save:
+    """Frames per second of ``Animation.save``, for a line and an image"""
+    params = [[32, 128, 512], [False, True]]
+    param_names = ['size', 'blit']
+    number = 1
+    timeout = 300
+
+    def setup(self, size, blit):
+        x = np.linspace(-1, 1, size)
+        X, Y = np.meshgrid(x, x)
+        t = np.linspace(0, 1, N_FRAMES)
+        images = np.sin(np.pi*(X[None] + Y[None] + t[:, None, None]))
+
+        self.fig, (ax1, ax2) = plt.subplots(1, 2)
+        blocks = [amp.blocks.Line(x, images[:, size//2], ax=ax1),
+                  amp.blocks.Imshow(images, ax=ax2)]
+        self.anim = amp.Animation(blocks, fig=self.fig, blit=blit)
+
+    def teardown(self, size, blit):
+        plt.close(self.fig)
+
+    def track_save_fps(self, size, blit):
+        start = time.perf_counter()
+        self.anim.save('unused', writer=_RawWriter(fps=10))
+        return N_FRAMES / (time.perf_counter() - start)
+    track_save_fps.unit = 'frames/s'
+
+
+class Import:
+    """The time taken to import animatplot in a new interpreter"""
+    def timeraw_import(self):
+        return "import animatplot"
+
+    def timeraw_import_without_matplotlib(self):
+        return "import animatplot", "import matplotlib.pyplot"
@@ -0,0 +1,111 @@
+"""Benchmarks of constructing blocks and updating them to a new frame
+
+Every block is given ``N_FRAMES`` frames of data. ``size`` is the number of
+points along each side of an image, so lines and scatter plots have
+``size**2`` points in every frame, to animate as much data as an image.
+"""
+import matplotlib.pyplot as plt
+import numpy as np
+
+import animatplot as amp
+
+N_FRAMES = 10
+SIZES = [32, 128, 512]
+
+
+def _images(size):
+    x = np.linspace(-1, 1, size)
+    X, Y = np.meshgrid(x, x)
+    t = np.linspace(0, 1, N_FRAMES)
+    return X, Y, np.sin(np.pi*(X[None] + Y[None] + t[:, None, None]))
+
+
+def _line_data(size):
+    x = np.linspace(0, 1, size**2)
+    t = np.linspace(0, 1, N_FRAMES)
+    return x, np.sin(2*np.pi*(x[None] + t[:, None]))
+
+
+def _scatter_data(size):
+    rng = np.random.default_rng(0)
+    return rng.random((N_FRAMES, size**2)), rng.random((N_FRAMES, size**2))
+
+
+def _pcolormesh_flat_data(size):
+    x = np.linspace(-1, 1, size+1)
+    X, Y = np.meshgrid(x, x)
+    return X, Y, _images(size)[2]
+
+
+def _quiver_data(size):
+    X, Y, C = _images(size)
+    return X, Y, C, -C
+
+
+def _title_data(size):
+    return np.linspace(0, 1, N_FRAMES),
+
+
+# name: (function returning the data, function making the block)
+BLOCKS = {
+    'Line': (_line_data, lambda ax, x, y: amp.blocks.Line(x, y, ax=ax)),
+    'Scatter': (_scatter_data,
+                lambda ax, x, y: amp.blocks.Scatter(x, y, ax=ax)),
+    'Pcolormesh-flat': (
+        _pcolormesh_flat_data,
+        lambda ax, X, Y, C: amp.blocks.Pcolormesh(X, Y, C, ax=ax,
+                                                  shading='flat')),
+    'Pcolormesh-nearest': (
+        _images,
+        lambda ax, X, Y, C: amp.blocks.Pcolormesh(X, Y, C, ax=ax,
+                                                  shading='nearest')),
+    'Imshow': (lambda size: _images(size)[2:],
+               lambda ax, C: amp.blocks.Imshow(C, ax=ax)),
+    'Quiver': (_quiver_data,
+               lambda ax, X, Y, U, V: amp.blocks.Quiver(X, Y, U, V, ax=ax)),
+    'Title': (_title_data,
+              lambda ax, t: amp.blocks.Title('t = {t:.2f}', ax=ax, t=t)),
+}
+
+
+class BlockUpdate:
+    """The time taken by ``Block._update``, not including drawing"""
+    params = (list(BLOCKS), SIZES)
+    param_names = ['block', 'size']
+
+    def setup(self, block, size):
+        self.fig, ax = plt.subplots()
+        make_data, make_block = BLOCKS[block]
+        self.block = make_block(ax, *make_data(size))
+        # some artists are only initialized when first drawn
+        self.fig.canvas.draw()
+        self.frame = 0
+
+    def teardown(self, block, size):
+        plt.close(self.fig)
+
+    def time_update(self, block, size):
+        self.frame = (self.frame + 1) % N_FRAMES
+        self.block._update(self.frame)
+
+
+class BlockConstruct:
+    """The time and peak memory taken to construct a block"""
+    params = (list(BLOCKS), SIZES)
+    param_names = ['block', 'size']
+    # construct every block on new axes
+    number = 1
+
+    def setup(self, block, size):
+        self.fig, self.ax = plt.subplots()
+        make_data, self.make_block = BLOCKS[block]
+        self.data = make_data(size)
+
+    def teardown(self, block, size):
+        plt.close(self.fig)
+
+    def time_construct(self, block, size):
+        self.make_block(self.ax, *self.data)
+
+    def peakmem_construct(self, block, size):
+        self.make_block(self.ax, *self.data)
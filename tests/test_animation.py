@@ -4,7 +4,7 @@ import os
 import pytest
 import numpy as np
 import matplotlib.pyplot as plt
-from matplotlib.animation import PillowWriter
+from matplotlib.animation import AbstractMovieWriter, PillowWriter
 import animatplot as amp
 from tests.tools import animation_compare
 
@@ -41,3 +41,352 @@ def test_save():
     anim.save_gif(base+'save')
     plt.close('all')
     assert os.path.exists(base+'save.gif')
+
+
+@animation_compare(baseline_images='Blocks/Line', nframes=5)
+def test_blit_save_matches():
+    x = np.linspace(0, 2*np.pi, 20)
+    t = np.linspace(0, 2*np.pi, 5)
+
+    X, T = np.meshgrid(x, t)
+    Y = np.sin(X+T)
+    block = amp.blocks.Line(X, Y)
+    return amp.Animation([block], blit=True)
+
+
+def test_blit_artists():
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, x)
+    line_block = amp.blocks.Line(X, X+T)
+    title_block = amp.blocks.Title('step {i}', i=range(5))
+
+    anim = amp.Animation([line_block, title_block], blit=True)
+    anim.timeline_slider()
+    artists = anim._init_blit()
+    assert line_block.line in artists
+    assert title_block.text in artists
+    assert anim.slider.poly in artists
+
+    anim.animation._init_draw()
+    anim.animation._step()
+    assert line_block.line in anim.animation._drawn_artists
+    assert line_block.line.get_animated()
+    plt.close('all')
+
+
+def test_update_returns_artists():
+    ax = plt.gca()
+    line, = ax.plot([0, 1], [0, 1])
+
+    def func(i):
+        line.set_ydata([0, i])
+        return line
+    block = amp.blocks.Update(func, length=3, ax=ax)
+    assert block._update(1) is line
+    assert block._init() == [line]
+
+    block = amp.blocks.Nuke(lambda i: ax.plot([0, 1], [i, i]), length=3, ax=ax)
+    artists = block._update(2)
+    assert artists == ax.lines[:]
+    plt.close('all')
+
+
+def test_save_parallel():
+    base = 'tests/output_images/'
+    if not os.path.exists(base):
+        os.mkdir(base)
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.linspace(0, 1, 7))
+
+    def make_anim():
+        plt.close('all')
+        title = amp.blocks.Title('frame {i}', i=range(7))
+        block = amp.blocks.Line(X, np.sin(X+T))
+        anim = amp.Animation([block, title])
+        anim.controls()
+        return anim
+
+    make_anim().save_gif(base+'serial')
+    make_anim().save_gif(base+'parallel', workers=2)
+    plt.close('all')
+    with open(base+'serial.gif', 'rb') as f1, open(base+'parallel.gif', 'rb') as f2:
+        assert f1.read() == f2.read()
+
+
+SEGMENT_SCRIPT = """
+import sys
+import matplotlib
+matplotlib.use('Agg')
+import numpy as np
+import animatplot as amp
+
+x = np.linspace(0, 1, 5)
+X, T = np.meshgrid(x, np.arange(7))
+blocks = [amp.blocks.Line(X, np.sin(X+T)),
+          amp.blocks.Title('frame {i}', i=range(7))]
+anim = amp.Animation(blocks)
+anim.controls()
+if sys.argv[1] == 'all':
+    anim.save(sys.argv[2], writer='pillow')
+else:
+    anim.save(sys.argv[2], writer='pillow', start=int(sys.argv[1]),
+              stop=int(sys.argv[1]) + 3)
+"""
+
+
+def test_save_segments():
+    import subprocess
+    import sys
+    from PIL import Image, ImageSequence
+
+    base = 'tests/output_images/'
+    if not os.path.exists(base):
+        os.mkdir(base)
+    jobs = [('all', base+'unsegmented.gif')] + [
+        (str(start), base+'segment{}.gif'.format(start))
+        for start in [0, 3, 6]]
+    processes = [subprocess.Popen([sys.executable, '-c', SEGMENT_SCRIPT,
+                                   start, filename])
+                 for start, filename in jobs]
+    assert all(process.wait() == 0 for process in processes)
+
+    segments = [filename for _, filename in jobs[1:]]
+    amp.writers.concat_segments(segments, base+'segmented.gif')
+
+    def frames(filename):
+        with Image.open(filename) as im:
+            return [np.asarray(frame.convert('RGB'))
+                    for frame in ImageSequence.Iterator(im)]
+    assert [len(frames(filename)) for filename in segments] == [3, 3, 1]
+    expected, actual = frames(base+'unsegmented.gif'), frames(
+        base+'segmented.gif')
+    assert len(actual) == len(expected) == 7
+    for a, e in zip(actual, expected):
+        np.testing.assert_equal(a, e)
+
+
+class _NullWriter(AbstractMovieWriter):
+    def setup(self, fig, outfile, dpi=None):
+        super().setup(fig, outfile, dpi)
+
+    def grab_frame(self, **savefig_kwargs):
+        pass
+
+    def finish(self):
+        pass
+
+
+def test_save_start():
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(6))
+    frames = []
+    block = amp.blocks.Update(frames.append, length=6)
+    anim = amp.Animation([amp.blocks.Line(X, X*T), block])
+    # the animation starts on the first draw
+    anim.fig.canvas.draw()
+    # saving doesn't depend on the frame that is displayed
+    anim._update_frame(4)
+    anim.timeline.index = 4
+    frames.clear()
+    anim.save('unused.gif', writer=_NullWriter(), start=2, stop=5)
+    assert frames == [2, 2, 3, 4]
+    assert anim.timeline.index == 4
+    # and doesn't leave anything behind to play on the next draw
+    frames.clear()
+    anim.fig.canvas.draw()
+    assert frames == []
+    with pytest.raises(ValueError):
+        anim.save('unused.gif', writer=_NullWriter(), start=5, stop=5)
+    plt.close('all')
+
+
+def test_selected_timeline():
+    base = 'tests/output_images/'
+    if not os.path.exists(base):
+        os.mkdir(base)
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(10))
+    line = amp.blocks.Line(X, X*T)
+    image = amp.blocks.Imshow(X[None]*np.arange(10)[:, None, None])
+    title = amp.blocks.Title('{t}', t=range(10))
+
+    timeline = amp.Timeline(np.arange(10)).resample([1.5, 6.25], method='linear')
+    anim = amp.Animation([line, image, title], timeline)
+    anim._update_frame(1)
+    np.testing.assert_allclose(line.line.get_ydata(), x*6.25)
+    np.testing.assert_allclose(image.im.get_array(), X*6.25)
+    assert title.text.get_text() == '6'
+
+    anim = amp.Animation([line], amp.Timeline(np.arange(10)).select(step=3))
+    anim.save_gif(base+'selected')
+    plt.close('all')
+
+    from PIL import Image
+    assert Image.open(base+'selected.gif').n_frames == 4
+
+
+def test_frame_cache():
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(10))
+    block = amp.blocks.Line(X, X*T)
+    anim = amp.Animation([block])
+    anim.controls(timeline_slider_args={'cache_bytes': 2*640*480*4})
+    anim.fig.canvas.draw()
+    anim._pause = True
+
+    draws = []
+    anim.fig.canvas.mpl_connect('draw_event', draws.append)
+    for i in [1, 2, 1, 3, 1, 2]:
+        anim.slider.set_val(i)
+    # 3 evicts 2, which was shown less recently than 1
+    assert len(draws) == 4
+    assert list(anim._frame_cache._frames) == [1, 2]
+    # the blocks still follow the slider
+    np.testing.assert_equal(block.line.get_ydata(), 2*x)
+
+    anim.fig.set_size_inches(3, 3)
+    anim.slider.set_val(2)
+    assert len(draws) == 5
+    plt.close('all')
+
+
+def test_slider_updates():
+    frames = []
+    block = amp.blocks.Update(frames.append, length=10)
+    anim = amp.Animation([block])
+    anim.timeline_slider(max_scrub_rate=1e-3)
+    frames.clear()
+
+    # playing updates every block once per frame
+    index = anim.timeline.index
+    anim.animation._func(0)
+    assert frames == [index]
+    assert anim.slider.val == index
+
+    # scrubbing a paused animation only renders the latest position
+    anim._pause = True
+    frames.clear()
+    for i in [1, 2, 3]:
+        anim.slider.set_val(i)
+    assert frames == [1]
+    assert anim._scrub_index == 3
+    anim._render_scrub()  # as done by the timer
+    assert frames == [1, 3]
+    plt.close('all')
+
+
+def test_prefetch():
+    from concurrent.futures import wait
+    import threading
+    threads = {}
+
+    def frame(i):
+        threads[i] = threading.current_thread().name
+        return np.full(5, float(i))
+
+    source = amp.sources.FunctionSource(frame, 10)
+    block = amp.blocks.Line(np.arange(5), source)
+    anim = amp.Animation([block], prefetch=3)
+    anim.timeline_slider()
+    # drop the frames prefetched when the animation was set up
+    anim._prefetcher.close()
+    threads.clear()
+
+    anim.timeline.index = 2
+    anim.animation._func(0)
+    np.testing.assert_equal(block.line.get_ydata(), 2)
+    wait(anim._prefetcher._pending.values())
+    # the next frames were fetched in the background
+    assert sorted(threads) == [2, 3, 4, 5]
+    assert threads[2] == threading.current_thread().name
+    assert all(threads[i].startswith('animatplot-prefetch')
+               for i in [3, 4, 5])
+
+    # and are handed to the block when it is updated
+    threads.clear()
+    anim.animation._func(0)
+    np.testing.assert_equal(block.line.get_ydata(), 3)
+    assert 3 not in threads
+
+    # jumping with the slider redirects the prefetching
+    anim._prefetcher.schedule(anim.timeline, 4)
+    pending = dict(anim._prefetcher._pending)
+    anim.slider.set_val(8)
+    assert all(future.cancelled() or future.done()
+               for future in pending.values())
+    assert sorted(i for _, i in anim._prefetcher._pending) == [0, 8, 9]
+    anim._prefetcher.close()
+    plt.close('all')
+
+
+def _ramp(i):
+    return np.full(5, float(i))
+
+
+def test_prefetch_pickle():
+    import pickle
+    from animatplot._prefetch import _Prefetcher
+    source = amp.sources.FunctionSource(_ramp, 10)
+    block = amp.blocks.Line(np.arange(5), source)
+    prefetcher = _Prefetcher([block], 2)
+    prefetcher.schedule(amp.Timeline(range(10)), 0)
+    # the threads and pending frames stay behind
+    copy = pickle.loads(pickle.dumps(prefetcher))
+    assert copy._pending == {} and copy._executor is None
+    np.testing.assert_equal(copy.get(copy.blocks[0].y, 1), 1)
+    np.testing.assert_equal(prefetcher.get(source, 1), 1)
+    prefetcher.close()
+    plt.close('all')
+
+
+def test_live():
+    from animatplot.sources import RingSource
+    x = np.linspace(0, 1, 10)
+    line = amp.blocks.Line(x, RingSource(3, [x]))
+    image = amp.blocks.Imshow(RingSource(3, [np.zeros((4, 4))]),
+                              pyramid=True)
+    title = amp.blocks.Title('step {n}', n=RingSource(3, [0]))
+    timeline = amp.Timeline.live([0], capacity=3)
+    anim = amp.Animation([line, image, title], timeline)
+    anim.timeline_slider()
+
+    for n in range(1, 6):
+        line.append(y=x * n)
+        image.append(ims=np.full((4, 4), n))
+        title.append(n=n)
+        timeline.append(n)
+        anim.animation._func(0)
+        # the newest frame is displayed
+        np.testing.assert_equal(line.line.get_ydata(), x * n)
+        np.testing.assert_equal(image.im.get_array(), n)
+        assert title.text.get_text() == 'step {}'.format(n)
+        assert anim.slider.valmax == min(n, 2)
+
+    assert len(line) == len(image) == len(title) == 3
+    np.testing.assert_equal(timeline.t, [3, 4, 5])
+    with pytest.raises(ValueError):
+        line.append(x=x, y=x)
+    with pytest.raises(TypeError):
+        amp.blocks.Line(x, [x, x]).append(y=x)
+    # blocks draw their first frame when they are created
+    with pytest.raises(IndexError):
+        amp.blocks.Line(x, RingSource(3))
+    plt.close('all')
+
+
+def test_prefetch_iter_source():
+    x = np.arange(5)
+
+    def frames():
+        return (np.full(5, float(i)) for i in range(20))
+
+    block = amp.blocks.Line(x, amp.sources.IterSource(frames, 20))
+    anim = amp.Animation([block], prefetch=3)
+    # the iterator is only read in order, and restarts when it wraps around
+    for i in range(45):
+        index = anim.timeline.index
+        anim.animation._func(i)
+        np.testing.assert_equal(block.line.get_ydata(), index)
+    assert anim._prefetcher._pending == {}
+    anim._prefetcher.close()
+    plt.close('all')
@@ -11,6 +11,7 @@ import animatplot as amp
 from tests.tools import animation_compare
 
 from animatplot.blocks import Block, Title
+from animatplot.sources import QuantizedSource
 
 setup()
 
@@ -71,6 +72,45 @@ class TestTitleBlock:
         actual = Title('timestep {num}', num=[1, 2], **expected)
         assert actual._mpl_kwargs == expected
 
+    def test_lazy_format(self):
+        values = np.linspace(0, 1, 1000)
+        title_block = Title('t = {t:.3f}, {n}', t=values, n=np.arange(1000),
+                            cache_size=2)
+        text = title_block.text
+        for i in [3, 999, 3, 500]:
+            assert title_block._update(i) is text
+            assert text.get_text() == 't = {:.3f}, {}'.format(values[i], i)
+        assert list(title_block._cache) == [3, 500]
+        assert title_block.titles == ['t = {:.3f}, {}'.format(t, n)
+                                      for n, t in enumerate(values)]
+        plt.close('all')
+
+    def test_set_titles(self):
+        title_block = Title('timestep {num}', num=[1, 2])
+        title_block._update(1)
+        title_block.titles = ['a', 'b', 'c']
+        assert title_block.titles == ['a', 'b', 'c']
+        assert len(title_block) == 3
+        title_block._update(1)
+        assert title_block.text.get_text() == 'b'
+        with pytest.raises(TypeError):
+            title_block.titles = [6, 7]
+        plt.close('all')
+
+    def test_float32_format(self):
+        values = np.array([0.1, 0.2], dtype=np.float32)
+        expected = ['{}'.format(v) for v in values]
+        assert Title('{v}', v=values).titles == expected
+        plt.close('all')
+
+    def test_text_in_place(self):
+        title_block = Title('timestep {num}', num=[1, 2], loc='left')
+        ax = plt.gca()
+        title_block._update(1)
+        assert ax.get_title(loc='left') == 'timestep 2'
+        assert ax.get_title() == ''
+        plt.close('all')
+
 
 def assert_jagged_arrays_equal(x, y):
     for x, y in zip(x, y):
@@ -119,6 +159,31 @@ class TestLineBlock:
         npt.assert_equal(line_block.line.get_xdata(), x)
         npt.assert_equal(line_block.x[-1], x)
 
+        # x is broadcast, not copied
+        assert np.shares_memory(line_block.x, x)
+        assert line_block.x.strides[0] == 0
+        line_block._update(3)
+        npt.assert_equal(line_block.line.get_xdata(), x)
+        npt.assert_equal(line_block.line.get_ydata(), y_data[3])
+
+        line_block = amp.blocks.Line(x, y_data.T, t_axis=1)
+        line_block._update(2)
+        npt.assert_equal(line_block.line.get_xdata(), x)
+        npt.assert_equal(line_block.line.get_ydata(), y_data[2])
+
+    def test_constant_x_ragged(self):
+        x = np.arange(4)
+        y_data = [np.array([5, 6, 7]), np.array([4, 2, 9, 10])]
+        line_block = amp.blocks.Line(x, y_data)
+        npt.assert_equal(line_block.line.get_xdata(), [0, 1, 2])
+        line_block._update(1)
+        npt.assert_equal(line_block.line.get_xdata(), x)
+        npt.assert_equal(line_block.line.get_ydata(), y_data[1])
+
+        with pytest.raises(ValueError) as err:
+            amp.blocks.Line(np.arange(3), y_data)
+        assert "at least as long" in str(err.value)
+
     def test_no_x_input(self):
         x = np.linspace(0, 1, 10)
         t = np.linspace(0, 1, 5)
@@ -198,6 +263,332 @@ class TestLineBlock:
         assert line_block.line.get_alpha() == 0.5
 
 
+class TestDecimate:
+    def render(self, block):
+        block.ax.figure.canvas.draw()
+        return np.asarray(block.ax.figure.canvas.buffer_rgba()).astype(int)
+
+    def test_line(self):
+        x = np.linspace(0, 10, 100000)
+        noise = np.random.RandomState(0).random_sample((3, len(x)))
+        y = np.sin(50*x) + noise
+
+        images = []
+        for decimate in [False, True]:
+            plt.figure(figsize=(4, 3), dpi=50)
+            block = amp.blocks.Line(x, y, decimate=decimate,
+                                    antialiased=False)
+            block._update(2)
+            images.append(self.render(block))
+        width = block.ax.bbox.width
+        assert len(block.line.get_xdata()) <= 4 * (width + 3)
+        assert (images[0] != images[1]).any(axis=-1).mean() < .01
+
+        # frames are decimated again when the axes change
+        block.ax.set_xlim(0, 1)
+        xdata = block.line.get_xdata()
+        assert xdata.max() < 1.01
+        assert len(xdata) > 4 * width
+        plt.close('all')
+
+    def test_precompute(self):
+        x = np.linspace(0, 1, 5000)
+        y = np.random.RandomState(0).random_sample((4, len(x)))
+        block = amp.blocks.Line(x, y, decimate=True)
+        block.precompute_lod()
+        assert sorted(block._lod_cache) == [0, 1, 2, 3]
+        for i in range(4):
+            expected = block._lod_indices(x, y[i], block._lod_state)
+            npt.assert_equal(block._lod_cache[i][0], x[expected])
+            npt.assert_equal(block._lod_cache[i][1], y[i][expected])
+        block.ax.set_xlim(0, .5)
+        block._update(1)
+        assert block._lod_cache == {}
+
+        with pytest.raises(ValueError):
+            amp.blocks.Line(x, y).precompute_lod()
+        plt.close('all')
+
+    def test_parametric_line(self):
+        t = np.linspace(0, 100, 20000)
+        x, y = t*np.cos(t), t*np.sin(t)
+        plt.figure(figsize=(4, 4), dpi=50)
+        block = amp.blocks.ParametricLine(x, y, decimate=True)
+        block.ax.set_xlim(-100, 100)
+        block.ax.set_ylim(-100, 100)
+        for i in [10, 15000, 19999]:
+            block._update(i)
+            xdata, ydata = block.line.get_data()
+            assert len(xdata) < i + 1 or i == 10
+            # the end of the line is always shown
+            assert (xdata[-1], ydata[-1]) == (x[i], y[i])
+            assert (xdata[0], ydata[0]) == (x[0], y[0])
+        plt.close('all')
+
+
+class TestParametricLineBlock:
+    def test_growing_prefix(self):
+        x = np.linspace(0, 1, 5)
+        y = x**2
+        block = amp.blocks.ParametricLine(x, y, ax=plt.gca())
+
+        assert len(block) == 5
+        npt.assert_equal(block.line.get_xdata(), x[:1])
+        block._update(3)
+        npt.assert_equal(block.line.get_xdata(), x[:4])
+        npt.assert_equal(block.line.get_ydata(), y[:4])
+        plt.close('all')
+
+    def test_bad_input(self):
+        with pytest.raises(ValueError):
+            amp.blocks.ParametricLine(np.arange(5), np.arange(6))
+
+
+class TestScatterBlock:
+    def test_offsets_in_place(self):
+        x = np.random.rand(4, 10)
+        y = np.random.rand(4, 10)
+        block = amp.blocks.Scatter(x, y, ax=plt.gca())
+        offsets = block.scat.get_offsets()
+        block._update(2)
+        assert block.scat.get_offsets() is offsets
+        npt.assert_equal(offsets, np.column_stack((x[2], y[2])))
+        plt.close('all')
+
+    def test_ragged(self):
+        x = [np.arange(3), np.arange(5)]
+        block = amp.blocks.Scatter(x, x, ax=plt.gca())
+        block._update(1)
+        npt.assert_equal(block.scat.get_offsets()[:, 0], np.arange(5))
+        plt.close('all')
+
+    def test_sizes_and_colors(self):
+        x = np.random.rand(4, 10)
+        c = np.arange(40).reshape(4, 10)
+        block = amp.blocks.Scatter(x, x, s=c+1, c=c, ax=plt.gca())
+        # the norm covers every frame
+        assert block.scat.norm.vmin == 0
+        assert block.scat.norm.vmax == 39
+        block._update(3)
+        npt.assert_equal(block.scat.get_sizes(), c[3]+1)
+        npt.assert_equal(block.scat.get_array(), c[3])
+        assert block.scat.norm.vmax == 39
+        plt.close('all')
+
+    def test_constant_color(self):
+        x = np.random.rand(4, 3)
+        block = amp.blocks.Scatter(x, x, c=['r', 'g', 'b'], ax=plt.gca())
+        assert not block._c_like_x
+        block._update(1)
+        plt.close('all')
+
+
+class TestQuiverBlock:
+    def test_list_input(self):
+        x = np.linspace(0, 1, 4)
+        X, Y = np.meshgrid(x, x)
+        U = [X + i for i in range(5)]
+        V = [Y - i for i in range(5)]
+        # t_axis has no effect on lists
+        block = amp.blocks.Quiver(X, Y, U, V, t_axis=2)
+        assert len(block) == 5
+        block._update(3)
+        npt.assert_equal(block.Q.U, U[3].ravel())
+        npt.assert_equal(block.Q.V, V[3].ravel())
+        plt.close('all')
+
+
+class TestVectorComp:
+    def test_zero_vectors(self):
+        x = np.linspace(-1, 1, 5)
+        X, Y = np.meshgrid(x, x)
+        U = np.stack([X, np.zeros_like(X)]).astype(np.float32)
+        V = np.stack([Y, np.zeros_like(Y)]).astype(np.float32)
+        pcolor, quiver = amp.blocks.vector_comp(X, Y, U, V, skip=2)
+
+        assert pcolor.C.dtype == np.float32
+        npt.assert_allclose(pcolor.C, np.sqrt(U**2 + V**2), rtol=1e-6)
+        assert quiver.U.dtype == np.float32
+        assert quiver.U.shape == (2, 3, 3)
+        assert not np.isnan(quiver.U).any()
+        # zero vectors are masked, so they aren't drawn
+        zero = (X[::2, ::2] == 0) & (Y[::2, ::2] == 0)
+        npt.assert_equal(np.ma.getmaskarray(quiver.U[0]), zero)
+        assert np.ma.getmaskarray(quiver.V[1]).all()
+        lengths = np.hypot(quiver.U[0], quiver.V[0])
+        npt.assert_allclose(lengths[~zero], 1, rtol=1e-6)
+        quiver._update(1)
+        assert np.all(quiver.Q.Umask)
+        plt.close('all')
+
+    def test_dtype(self):
+        x = np.linspace(-1, 1, 5)
+        X, Y = np.meshgrid(x, x)
+        U = np.ones((3, 5, 5), dtype=int)
+        pcolor, quiver = amp.blocks.vector_comp(X, Y, U, U, dtype=np.float32)
+        assert pcolor.C.dtype == np.float32
+        assert quiver.U.dtype == np.float32
+        pcolor, quiver = amp.blocks.vector_comp(X, Y, U, U)
+        assert pcolor.C.dtype == np.float64
+        plt.close('all')
+
+
+class TestTimeMajor:
+    def setup_method(self):
+        x = np.linspace(0, 1, 6)
+        X, Y, T = np.meshgrid(x, x, np.linspace(0, 1, 4))
+        self.X, self.Y = X[:, :, 0], Y[:, :, 0]
+        self.C = np.sin(X+Y+T)
+
+    def teardown_method(self):
+        plt.close('all')
+
+    def test_copied(self):
+        block = amp.blocks.Pcolormesh(self.X, self.Y, self.C, t_axis=2,
+                                      shading='nearest')
+        report = block.to_time_major()
+        assert report == {'actions': {'C': 'copied'}, 'nbytes': self.C.nbytes}
+        assert block.t_axis == 0
+        assert block.C.flags['C_CONTIGUOUS']
+        block._update(3)
+        npt.assert_equal(block.quad.get_array(), self.C[:, :, 3])
+
+        # nothing left to do
+        report = block.to_time_major()
+        assert report == {'actions': {'C': 'contiguous'}, 'nbytes': 0}
+
+    def test_budget(self):
+        block = amp.blocks.Quiver(self.X, self.Y, self.C, self.C, t_axis=2)
+        report = block.to_time_major(max_bytes=100)
+        assert report['actions'] == {'U': 'skipped', 'V': 'skipped'}
+        assert block.t_axis == 2
+
+        report = block.to_time_major(max_bytes=100, chunk_size=2)
+        assert report['actions'] == {'U': 'chunked', 'V': 'chunked'}
+        block._update(3)
+        npt.assert_equal(block.Q.U, self.C[:, :, 3].ravel())
+
+    def test_line(self):
+        x = np.linspace(0, 1, 6)
+        y = self.C[0]
+        block = amp.blocks.Line(x, y, t_axis=1)
+        report = block.to_time_major()
+        # the broadcast x doesn't need to be copied
+        assert report == {'actions': {'x': 'contiguous', 'y': 'copied'},
+                          'nbytes': y.nbytes}
+        assert np.shares_memory(block.x, x)
+        block._update(2)
+        npt.assert_equal(block.line.get_ydata(), y[:, 2])
+
+        block = amp.blocks.Line(x, y, t_axis=1)
+        block.to_time_major(max_bytes=0, chunk_size=2)
+        block._update(3)
+        npt.assert_equal(block.line.get_xdata(), x)
+        npt.assert_equal(block.line.get_ydata(), y[:, 3])
+
+
+class TestPyramid:
+    def test_levels(self):
+        images = np.random.RandomState(0).random_sample((3, 512, 256))
+        fig = plt.figure(figsize=(2.56, 5.12), dpi=25)
+        ax = fig.add_axes([0, 0, 1, 1])
+        block = amp.blocks.Imshow(images, ax=ax, pyramid=True, aspect='auto')
+        extent = block.im.get_extent()
+        # 64 pixels of the axes show 256 pixels of the image
+        assert block._level == 2
+        block._update(1)
+        npt.assert_allclose(block.im.get_array(),
+                            images[1].reshape(128, 4, 64, 4).mean((1, 3)))
+        assert block.im.get_extent() == extent
+
+        # zooming in shows more detail
+        block.ax.set_xlim(0, 64)
+        block.ax.set_ylim(64, 0)
+        assert block._level == 0
+        npt.assert_equal(block.im.get_array(), images[1])
+        plt.close('all')
+
+    def test_precompute(self):
+        images = (np.random.RandomState(0).random_sample((3, 65, 63, 3))
+                  * 255).astype(np.uint8)
+        fig = plt.figure(figsize=(1, 1), dpi=15)
+        ax = fig.add_axes([0, 0, 1, 1])
+        block = amp.blocks.Imshow(images, ax=ax, pyramid=True)
+        lazy = block.im.get_array()
+        assert lazy.dtype == np.uint8
+        assert lazy.shape == (17, 16, 3)
+
+        nbytes = block.precompute_pyramid()
+        assert nbytes == 3 * 3 * (33*32 + 17*16 + 9*8 + 5*4 + 3*2)
+        block._update(0)
+        npt.assert_equal(block.im.get_array(), lazy)
+        plt.close('all')
+
+
+class TestStoreAs:
+    def test_cast(self):
+        images = np.random.RandomState(0).random_sample((4, 5, 6))
+        block = amp.blocks.Imshow(images)
+        report = block.store_as('float32')
+        assert report == {'actions': {'ims': 'cast'},
+                          'nbytes': images.size * 4}
+        assert block.ims.dtype == np.float32
+        block._update(2)
+        npt.assert_allclose(block.im.get_array(), images[2], rtol=1e-6)
+        plt.close('all')
+
+    def test_quantize(self):
+        C = np.random.RandomState(0).random_sample((5, 6, 4))
+        X, Y = np.meshgrid(np.arange(6), np.arange(5))
+        block = amp.blocks.Pcolormesh(X, Y, C, t_axis=2, shading='nearest')
+        report = block.store_as('uint16')
+        assert report['actions'] == {'C': 'quantized'}
+        assert isinstance(block.C, QuantizedSource)
+        assert len(block) == 4
+        block._update(3)
+        npt.assert_allclose(block.quad.get_array(), C[:, :, 3],
+                            atol=1/65534)
+        plt.close('all')
+
+    def test_animation(self):
+        x = np.linspace(0, 1, 10)
+        y = [np.arange(3.), np.arange(5.)]
+        images = np.zeros((2, 3, 3), dtype=np.uint8)
+        blocks = [amp.blocks.Line(x, np.zeros((2, 10))),
+                  amp.blocks.Line(y, y),
+                  amp.blocks.Imshow(images)]
+        amp.Animation(blocks, store_as='float16')
+        assert blocks[0].y.dtype == np.float16
+        # the constant x is cast once, and broadcast again
+        assert blocks[0].x.dtype == np.float16
+        assert blocks[0].x.shape == (2, 10)
+        assert blocks[0].x.strides[0] == 0
+        npt.assert_allclose(blocks[0].x[1], x, rtol=1e-3)
+        assert blocks[1].y.values.dtype == np.float16
+        # integer images are left as they are
+        assert blocks[2].ims.dtype == np.uint8
+        plt.close('all')
+
+    def test_constant(self):
+        x = np.linspace(0, 1, 100)
+        block = amp.blocks.Line(x, np.zeros((50, 100)))
+        report = block.store_as('float32')
+        assert report == {'actions': {'x': 'cast', 'y': 'cast'},
+                          'nbytes': 100 * 4 + 50 * 100 * 4}
+        report = block.store_as('uint16')
+        assert report['actions'] == {'x': 'unchanged', 'y': 'quantized'}
+        plt.close('all')
+
+    def test_budget(self):
+        block = amp.blocks.Imshow(np.zeros((4, 5, 6)))
+        with amp.memory.budget(10):
+            with pytest.raises(MemoryError):
+                block.store_as('uint16')
+        with pytest.raises(TypeError):
+            block.store_as('int16')
+        plt.close('all')
+
+
 class TestComparisons:
     @animation_compare(baseline_images='Blocks/Line', nframes=5)
     def test_Line(self):
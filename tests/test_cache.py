@@ -0,0 +1,91 @@
+from matplotlib.testing import setup
+setup()
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+import animatplot as amp
+
+
+def make_anim(titles, color='C0', update=False):
+    plt.close('all')
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(5))
+    blocks = [amp.blocks.Line(X, np.sin(X+T), color=color),
+              amp.blocks.Title(titles)]
+    if update:
+        blocks.append(amp.blocks.Update(lambda i: None, length=5))
+    return amp.Animation(blocks)
+
+
+def read(filename):
+    with open(filename, 'rb') as f:
+        return f.read()
+
+
+def test_disk_cache(tmpdir):
+    cache = amp.cache.DiskCache(str(tmpdir.join('frames')))
+    base = str(tmpdir) + '/'
+    titles = ['frame {}'.format(i) for i in range(5)]
+
+    make_anim(titles).save_gif(base+'first', cache=cache)
+    assert cache.stats()['misses'] == 5
+    assert cache.stats()['frames'] == 5
+
+    # nothing changed, so only the first frame is drawn again
+    cache.reset_stats()
+    make_anim(titles).save_gif(base+'again', cache=cache)
+    make_anim(titles).save_gif(base+'uncached')
+    assert read(base+'again.gif') == read(base+'uncached.gif')
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses']) == (4, 0)
+    assert stats['hit_rate'] == 1
+
+    # only the frame that changed is rendered
+    cache.reset_stats()
+    titles[3] = 'changed'
+    make_anim(titles).save_gif(base+'changed', cache=cache)
+    make_anim(titles).save_gif(base+'uncached')
+    assert read(base+'changed.gif') == read(base+'uncached.gif')
+    assert (cache.hits, cache.misses) == (3, 1)
+
+    # changing the first frame only renders that frame again
+    cache.reset_stats()
+    titles[0] = 'changed'
+    make_anim(titles).save_gif(base+'first_changed', cache=cache)
+    assert (cache.hits, cache.misses) == (4, 1)
+
+    # and segments share the frames of the whole animation
+    cache.reset_stats()
+    make_anim(titles).save(base+'segment.gif', writer='pillow', start=3,
+                           cache=cache)
+    assert (cache.hits, cache.misses) == (1, 0)
+
+    # the style of the artists is part of the key of every frame
+    cache.reset_stats()
+    make_anim(titles, color='red').save_gif(base+'red', cache=cache)
+    assert (cache.hits, cache.misses) == (0, 5)
+
+    # frames drawn by functions are never cached
+    cache.reset_stats()
+    make_anim(titles, update=True).save_gif(base+'update', cache=cache)
+    assert (cache.hits, cache.misses) == (0, 0)
+    plt.close('all')
+
+
+def test_eviction(tmpdir):
+    cache = amp.cache.DiskCache(str(tmpdir))
+    make_anim(['a', 'b', 'c', 'd', 'e']).save_gif(str(tmpdir.join('anim')),
+                                                  cache=cache)
+    sizes = sorted(os.path.getsize(entry.path)
+                   for entry in os.scandir(str(tmpdir))
+                   if entry.name.endswith('.rgba.z'))
+    cache.max_bytes = sum(sizes[-2:])
+    cache.evict()
+    stats = cache.stats()
+    assert stats['nbytes'] <= cache.max_bytes
+    assert stats['evictions'] == 5 - stats['frames']
+    assert stats['frames'] >= 2
+
+    cache.clear()
+    assert cache.stats()['frames'] == 0
+    plt.close('all')
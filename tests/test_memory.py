@@ -0,0 +1,71 @@
+from matplotlib.testing import setup
+setup()
+import numpy as np
+import matplotlib.pyplot as plt
+import pytest
+import animatplot as amp
+from animatplot.sources import FrameSource
+
+
+def test_memory_report():
+    x = np.linspace(0, 1, 10)
+    X, T = np.meshgrid(x, np.arange(5))
+    line = amp.blocks.Line(x, X*T)
+    images = amp.blocks.Imshow([np.ones((4, 4))]*5)
+    anim = amp.Animation([line, images])
+
+    report = anim.memory_report()
+    # x is only held as a broadcast view
+    assert report['0:Line']['arrays']['x'] == {'owned': 0, 'views': 80}
+    assert report['0:Line']['owned'] == 400
+    assert report['1:Imshow']['owned'] == 5*16*8
+    assert report['total'] == {'owned': 400 + 5*16*8, 'views': 80}
+    plt.close('all')
+
+
+def test_budget():
+    frames = [np.ones((4, 4))]*5
+    with amp.memory.budget(1000):
+        # the first copy fits, the second falls back to a lazy source
+        block = amp.blocks.Imshow(frames)
+        assert isinstance(block.ims, np.ndarray)
+        block = amp.blocks.Imshow(frames)
+        assert isinstance(block.ims, FrameSource)
+        block._update(3)
+
+        block = amp.blocks.Scatter([np.ones(50)]*5, [np.ones(50)]*5)
+        assert isinstance(block.x, FrameSource)
+        assert isinstance(block.y, FrameSource)
+
+        block = amp.blocks.Line([np.arange(50)]*5, [np.ones(50)]*5)
+        assert isinstance(block.y, FrameSource)
+        np.testing.assert_equal(block.line.get_xdata(), np.arange(50))
+
+    with amp.memory.budget(1000, lazy=False):
+        with pytest.raises(MemoryError):
+            amp.blocks.Imshow([np.ones((4, 4))]*10)
+        with pytest.raises(MemoryError):
+            amp.util.parametric_line(np.arange(50), np.arange(50))
+    plt.close('all')
+
+
+def test_vector_comp_budget():
+    x = np.linspace(-1, 1, 10)
+    X, Y, T = np.meshgrid(x, x, np.arange(4))
+    U, V = np.cos(X + T), np.sin(Y + T)
+    pcolor, quiver = amp.blocks.vector_comp(X[:, :, 0], Y[:, :, 0], U, V,
+                                            skip=2, t_axis=2)
+    with amp.memory.budget(0):
+        lazy_pcolor, lazy_quiver = amp.blocks.vector_comp(
+            X[:, :, 0], Y[:, :, 0], U, V, skip=2, t_axis=2)
+    assert isinstance(lazy_pcolor.C, FrameSource)
+    for i in range(4):
+        pcolor._update(i)
+        lazy_pcolor._update(i)
+        np.testing.assert_allclose(lazy_pcolor.quad.get_array(),
+                                   pcolor.quad.get_array())
+        quiver._update(i)
+        lazy_quiver._update(i)
+        np.testing.assert_allclose(lazy_quiver.Q.U, quiver.Q.U)
+        np.testing.assert_allclose(lazy_quiver.Q.V, quiver.Q.V)
+    plt.close('all')
@@ -0,0 +1,70 @@
+from matplotlib.testing import setup
+setup()
+import os
+import numpy as np
+import matplotlib.pyplot as plt
+import animatplot as amp
+
+
+def test_stats():
+    profiler = amp.Profiler()
+    profiler.timings = {'draw': [.1, .2, .3, .4], 'write': [2.]}
+    stats = profiler.stats()
+    assert stats['draw']['count'] == 4
+    np.testing.assert_allclose(stats['draw']['total'], 1)
+    np.testing.assert_allclose(stats['draw']['p50'], .25)
+    assert stats['draw']['max'] == .4
+    # slowest first
+    lines = profiler.summary().splitlines()
+    assert lines[1].startswith('write')
+    assert lines[2].startswith('draw')
+
+
+def test_profile_save():
+    base = 'tests/output_images/'
+    if not os.path.exists(base):
+        os.mkdir(base)
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(4))
+
+    frames, progress = [], []
+    profiler = amp.Profiler(
+        frame_callback=lambda i, timings: frames.append((i, dict(timings))),
+        progress_callback=lambda *args: progress.append(args))
+    blocks = [amp.blocks.Line(X, X*T),
+              amp.blocks.Title('{t}', t=np.arange(4))]
+    anim = amp.Animation(blocks, profiler=profiler)
+    anim.timeline_slider()
+    profiler.reset()
+    anim.save_gif(base + 'profiled')
+
+    assert [args[:2] for args in progress] == [(i, 4) for i in range(4)]
+    assert progress[-1][2] == 0
+    assert sorted(i for i, _ in frames[-4:]) == [0, 1, 2, 3]
+    for _, timings in frames[-4:]:
+        assert set(timings) == {'0:Line', '1:Title', 'slider', 'draw',
+                                'write'}
+    assert profiler.stats()['draw']['count'] == 4
+    plt.close('all')
+
+
+def test_profile_save_parallel(tmpdir):
+    x = np.linspace(0, 1, 5)
+    X, T = np.meshgrid(x, np.arange(4))
+    cache = amp.cache.DiskCache(str(tmpdir.join('frames')))
+
+    frames = []
+    profiler = amp.Profiler(
+        frame_callback=lambda i, timings: frames.append((i, set(timings))))
+    anim = amp.Animation([amp.blocks.Line(X, X*T)], profiler=profiler)
+    anim.save(str(tmpdir.join('parallel.gif')), writer='pillow', workers=2,
+              cache=cache)
+    # the first frame is rendered by the parent
+    assert frames == [(0, {'0:Line', 'draw', 'write'})] + [
+        (i, {'render', 'write'}) for i in range(1, 4)]
+
+    frames.clear()
+    anim.save(str(tmpdir.join('cached.gif')), writer='pillow', cache=cache)
+    assert frames == [(0, {'0:Line', 'draw', 'write'})] + [
+        (i, {'cache', 'write'}) for i in range(1, 4)]
+    plt.close('all')
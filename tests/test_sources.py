@@ -0,0 +1,293 @@
+from matplotlib.testing import setup
+setup()
+import pytest
+import numpy as np
+import numpy.testing as npt
+import matplotlib.pyplot as plt
+import animatplot as amp
+from animatplot.sources import (
+    ChunkedSource, FunctionSource, IterSource, QuantizedSource, RaggedSource,
+    RingSource, SequenceSource
+)
+
+
+class TestSources:
+    def test_function_source(self):
+        calls = []
+
+        def frame(i):
+            calls.append(i)
+            return np.full(3, i)
+        source = FunctionSource(frame, 4)
+        assert len(source) == 4
+        npt.assert_equal(source[2], [2, 2, 2])
+        npt.assert_equal(source[-1], [3, 3, 3])
+        assert calls == [2, 3]
+        with pytest.raises(IndexError):
+            source[4]
+
+    def test_sequence_source(self):
+        frames = [np.arange(3), np.arange(3)+1]
+        source = SequenceSource(frames)
+        assert len(source) == 2
+        assert source[1] is frames[1]
+
+    def test_iter_source(self):
+        source = IterSource((np.full(2, i) for i in range(5)), 5)
+        npt.assert_equal(source[0], [0, 0])
+        npt.assert_equal(source[0], [0, 0])
+        npt.assert_equal(source[3], [3, 3])
+        with pytest.raises(IndexError):
+            source[1]
+
+    def test_iter_source_restart(self):
+        source = IterSource(lambda: (np.full(2, i) for i in range(5)), 5)
+        npt.assert_equal(source[4], [4, 4])
+        npt.assert_equal(source[1], [1, 1])
+
+        short = IterSource(lambda: iter([1, 2]), 5)
+        with pytest.raises(IndexError):
+            short[3]
+
+
+class TestRaggedSource:
+    def test_frames(self):
+        frames = [np.arange(3), np.arange(0), np.arange(2)]
+        source = RaggedSource.from_frames(frames)
+        assert len(source) == 3
+        npt.assert_equal(source.offsets, [0, 3, 3, 5])
+        npt.assert_equal(source.lengths, [3, 0, 2])
+        for i, frame in enumerate(frames):
+            npt.assert_equal(source[i], frame)
+        # frames are views of the values
+        assert source[2].base is source.values
+
+    def test_bad_offsets(self):
+        with pytest.raises(ValueError):
+            RaggedSource(np.arange(5), [0, 3, 2, 5])
+        with pytest.raises(ValueError):
+            RaggedSource(np.arange(5), [0, 3])
+
+    def test_blocks(self):
+        x = RaggedSource(np.arange(7), [0, 3, 7])
+        y = RaggedSource(np.arange(7)**2, [0, 3, 7])
+        block = amp.blocks.Line(x, y, ax=plt.gca())
+        block._update(1)
+        npt.assert_equal(block.line.get_ydata(), [9, 16, 25, 36])
+
+        with pytest.raises(ValueError):
+            amp.blocks.Line(x, RaggedSource(np.arange(7), [0, 2, 7]))
+
+        block = amp.blocks.Scatter(x, y, ax=plt.gca())
+        block._update(1)
+        npt.assert_equal(block.scat.get_offsets()[:, 1], [9, 16, 25, 36])
+        plt.close('all')
+
+    def test_ragged_lists(self):
+        x = [np.arange(3), np.arange(5)]
+        line = amp.blocks.Line(x, x, ax=plt.gca())
+        assert isinstance(line.y, RaggedSource)
+        scatter = amp.blocks.Scatter(x, x, c=x, ax=plt.gca())
+        assert isinstance(scatter.x, RaggedSource)
+        assert isinstance(scatter.c, RaggedSource)
+        assert scatter.scat.norm.vmax == 4
+        plt.close('all')
+
+
+class TestQuantizedSource:
+    def test_round_trip(self):
+        data = np.random.RandomState(0).normal(size=(5, 20, 30))
+        data[1, 2, 3] = np.nan
+        source = QuantizedSource.from_array(data, t_axis=1, chunk_size=3)
+        assert source.codes.dtype == np.uint16
+        assert source.codes.shape == (20, 5, 30)
+        assert len(source) == 20
+        step = (np.nanmax(data) - np.nanmin(data)) / 65534
+        for i in range(20):
+            npt.assert_allclose(source[i], data[:, i], atol=step)
+        assert np.isnan(source[2][1, 3])
+        assert source[0].dtype == np.float32
+
+    def test_constant(self):
+        source = QuantizedSource.from_array(np.full((2, 3), 4.), dtype='uint8')
+        npt.assert_equal(source[1], [4, 4, 4])
+        with pytest.raises(TypeError):
+            QuantizedSource.from_array(np.zeros((2, 3)), dtype='int16')
+
+
+class TestRingSource:
+    def test_rolls(self):
+        source = RingSource(3, [[0, 0], [1, 1]])
+        assert len(source) == 2
+        frame = np.array([2, 2])
+        source.append(frame)
+        frame[:] = 9
+        source.append([3, 3])
+        assert len(source) == 3
+        assert source.total == 4 and source.first == 1
+        npt.assert_equal([source[i] for i in range(3)], [[1, 1], [2, 2], [3, 3]])
+        npt.assert_equal(source[-1], [3, 3])
+        # frames are held in a single array, allocated once
+        assert source._buffer.shape == (3, 2)
+        # and the frame returned isn't written over
+        oldest = source[0]
+        source.append([4, 4])
+        npt.assert_equal(oldest, [1, 1])
+
+    def test_ragged(self):
+        source = RingSource(2, [[0, 0], [1, 1]])
+        source.extend([[2, 2, 2], [3]])
+        npt.assert_equal(source[0], [2, 2, 2])
+        npt.assert_equal(source[1], [3])
+        titles = RingSource(2, ['a', 'b', 'c'])
+        assert [titles[0], titles[1]] == ['b', 'c']
+
+    def test_capacity(self):
+        with pytest.raises(ValueError):
+            RingSource(0)
+        with pytest.raises(IndexError):
+            RingSource(2)[0]
+
+
+class TestLazyBlocks:
+    def setup_method(self):
+        self.x = np.linspace(0, 1, 6)
+        self.t = np.linspace(0, 1, 4)
+        X, T = np.meshgrid(self.x, self.t)
+        self.data = np.sin(X+T)
+
+    def teardown_method(self):
+        plt.close('all')
+
+    def source(self, data):
+        return FunctionSource(lambda i: data[i], len(data))
+
+    def test_line(self):
+        block = amp.blocks.Line(self.x, self.source(self.data))
+        assert len(block) == 4
+        block._update(2)
+        npt.assert_equal(block.line.get_xdata(), self.x)
+        npt.assert_equal(block.line.get_ydata(), self.data[2])
+
+        block = amp.blocks.Line(self.source(self.data))
+        npt.assert_equal(block.line.get_xdata(), np.arange(6))
+
+        X = np.tile(self.x, (4, 1))
+        block = amp.blocks.Line(self.source(X), self.source(self.data))
+        block._update(3)
+        npt.assert_equal(block.line.get_xdata(), self.x)
+
+        with pytest.raises(TypeError):
+            amp.blocks.Line(self.source(X), self.data)
+
+    def test_scatter(self):
+        block = amp.blocks.Scatter(self.source(self.data), self.source(self.data),
+                                   s=self.source(self.data+1))
+        block._update(1)
+        npt.assert_equal(block.scat.get_offsets()[:, 0], self.data[1])
+        npt.assert_equal(block.scat.get_sizes(), self.data[1]+1)
+
+    def test_image_like(self):
+        images = np.random.rand(4, 5, 5)
+        block = amp.blocks.Imshow(self.source(images))
+        assert len(block) == 4
+        block._update(3)
+        npt.assert_equal(block.im.get_array(), images[3])
+
+        x = np.arange(5)
+        block = amp.blocks.Pcolormesh(x, x, self.source(images), shading='nearest')
+        block._update(2)
+        npt.assert_equal(block.quad.get_array(), images[2])
+
+    def test_quiver(self):
+        x = np.arange(5)
+        X, Y = np.meshgrid(x, x)
+        U = np.random.rand(4, 5, 5)
+        block = amp.blocks.Quiver(X, Y, self.source(U), self.source(-U))
+        block._update(1)
+        npt.assert_equal(block.Q.U, U[1].ravel())
+        npt.assert_equal(block.Q.V, -U[1].ravel())
+
+    def test_only_displayed_frames_read(self):
+        data = self.data
+
+        class Frames:
+            reads = []
+
+            def __len__(self):
+                return len(data)
+
+            def __getitem__(self, i):
+                self.reads.append(i)
+                return data[i]
+
+        amp.blocks.Line(self.x, SequenceSource(Frames()))
+        amp.blocks.Scatter(SequenceSource(Frames()), SequenceSource(Frames()))
+        assert Frames.reads == [0, 0, 0]
+
+    def test_animation(self):
+        block = amp.blocks.Line(self.x, IterSource(lambda: iter(self.data), 4))
+        anim = amp.Animation([block])
+        for i in range(6):
+            anim.animation._func(i)
+        npt.assert_equal(block.line.get_ydata(), self.data[1])
+
+
+class TestChunkedSource:
+    def setup_method(self):
+        self.data = np.random.rand(4, 5, 11)
+
+    def test_memmap(self, tmp_path):
+        np.save(tmp_path / 'data.npy', self.data)
+        data = np.load(tmp_path / 'data.npy', mmap_mode='r')
+        source = ChunkedSource(data, t_axis=2, chunk_size=3)
+        assert len(source) == 11
+        for i in [0, 4, 10, 2]:
+            frame = source[i]
+            assert frame.flags['C_CONTIGUOUS']
+            npt.assert_equal(frame, self.data[:, :, i])
+        assert list(source._chunks) == [0]
+
+        # chunks are read into memory even when no axes are moved
+        np.save(tmp_path / 'frames.npy', np.moveaxis(self.data, 2, 0))
+        data = np.load(tmp_path / 'frames.npy', mmap_mode='r')
+        source = ChunkedSource(data, chunk_size=3)
+        frame = source[4]
+        npt.assert_equal(frame, self.data[:, :, 4])
+        assert not np.shares_memory(source._chunks[1], data)
+
+    def test_read_ahead(self):
+        source = ChunkedSource(self.data, t_axis=2, chunk_size=2, read_ahead=3)
+        npt.assert_equal(source[9], self.data[:, :, 9])
+        # frames 9, 10, 0, 1 are in chunks 4, 5 and 0
+        assert sorted(source._chunks) == [0, 4, 5]
+        npt.assert_equal(source[0], self.data[:, :, 0])
+        source.close()
+
+    def test_blocks(self, tmp_path):
+        np.save(tmp_path / 'data.npy', self.data)
+        data = np.load(tmp_path / 'data.npy', mmap_mode='r')
+
+        block = amp.blocks.Imshow(data, t_axis=2, read_ahead=2)
+        assert isinstance(block.ims, ChunkedSource)
+        assert len(block) == 11
+        block._update(5)
+        npt.assert_equal(block.im.get_array(), self.data[:, :, 5])
+
+        x = np.arange(5)
+        block = amp.blocks.Pcolormesh(np.arange(11), x, data, t_axis=0,
+                                      chunk_size=2, shading='nearest')
+        assert isinstance(block.C, ChunkedSource)
+        block._update(3)
+        npt.assert_equal(block.quad.get_array(), self.data[3])
+        plt.close('all')
+
+    def test_hdf5(self, tmp_path):
+        h5py = pytest.importorskip('h5py')
+        with h5py.File(tmp_path / 'data.h5', 'w') as f:
+            f['data'] = self.data
+        with h5py.File(tmp_path / 'data.h5', 'r') as f:
+            block = amp.blocks.Imshow(f['data'], t_axis=2)
+            block._update(7)
+            npt.assert_equal(block.im.get_array(), self.data[:, :, 7])
+        plt.close('all')
@@ -31,3 +31,65 @@ def test_parse():
 
     with pytest.raises(ValueError):
         Timeline(np.random.rand(3, 4))
+
+
+def test_select():
+    t = Timeline(np.arange(10)*.5, units='s')
+    selected = t.select(2, 9, 3)
+    assert len(selected) == 3
+    assert (selected.t == [1, 2.5, 4]).all()
+    assert [selected._frame(i) for i in range(3)] == [2, 5, 8]
+    assert selected._data_len == 10
+    assert selected.units == 's'
+
+    # selections compose
+    assert selected.select(step=2)._frame(1) == 8
+    assert t._frame(4) == 4
+
+
+def test_resample():
+    t = Timeline(np.array([0, 1, 2, 4]))
+    nearest = t.resample([0, 0.9, 2.9, 4])
+    assert [nearest._frame(i) for i in range(4)] == [0, 1, 2, 3]
+
+    linear = t.resample([0.5, 3], method='linear')
+    assert [linear._frame(i) for i in range(2)] == [0.5, 2.5]
+
+    with pytest.raises(ValueError):
+        t.resample([1], method='cubic')
+
+    log = Timeline([1, 10, 100], log=True).resample([10, 100])
+    assert [log._frame(i) for i in range(2)] == [1, 2]
+
+
+def test_live():
+    t = Timeline.live([0, 1], capacity=3, follow=False)
+    t.append(2)
+    t.index = 2
+    t.append([3, 4])
+    np.testing.assert_equal(t.t, [2, 3, 4])
+    assert len(t) == 3
+    # the same frame is still displayed
+    assert t.index == 0
+    t._update()
+    t._update()
+    t._update()
+    # and the timeline waits at the newest frame
+    assert t.index == 2
+
+    grown = Timeline.live([0], follow=True)
+    for i in range(1, 100):
+        grown.append(i)
+        assert grown.index == i
+    np.testing.assert_equal(grown.t, np.arange(100))
+    grown.append(99.5)
+    assert grown.t[-1] == 99.5
+    # the times are kept in a buffer that grows in steps
+    assert len(grown._buffer) < 400
+
+    with pytest.raises(ValueError):
+        Timeline.live([])
+    with pytest.raises(ValueError):
+        Timeline([0, 1]).append(2)
+    with pytest.raises(ValueError):
+        t.select(0, 1)
@@ -0,0 +1,41 @@
+from matplotlib.testing import setup
+setup()
+import os
+import shutil
+from io import BytesIO
+import pytest
+import numpy as np
+import matplotlib.pyplot as plt
+import animatplot as amp
+from animatplot.writers import FFMpegRawWriter
+
+
+def make_animation(blit=False):
+    x = np.linspace(0, 1, 10)
+    X, T = np.meshgrid(x, np.linspace(0, 1, 4))
+    line = amp.blocks.Line(X, np.sin(X+T))
+    title = amp.blocks.Title('frame {i}', i=range(4))
+    return amp.Animation([line, title], blit=blit)
+
+
+@pytest.mark.parametrize('blit', [False, True])
+def test_raw_frame_matches_savefig(blit):
+    anim = make_animation(blit)
+    writer = FFMpegRawWriter(fps=5)
+    writer.fig, writer.dpi, writer._renderer = anim.fig, 72, None
+
+    buf = BytesIO()
+    anim.fig.savefig(buf, format='rgba', dpi=72)
+    assert bytes(writer._render()) == buf.getvalue()
+    plt.close('all')
+
+
+@pytest.mark.skipif(shutil.which('ffmpeg') is None, reason="requires ffmpeg")
+def test_save_ffmpeg_raw():
+    base = 'tests/output_images/'
+    if not os.path.exists(base):
+        os.mkdir(base)
+    anim = make_animation()
+    anim.save(base+'raw.mp4', writer='ffmpeg_raw')
+    plt.close('all')
+    assert os.path.getsize(base+'raw.mp4') > 0